@@ -0,0 +1,6 @@
+"""
+Offline performance benchmarks for the MMM hot paths.
+
+Run with ``python -m benchmarks run`` and compare two result files with
+``python -m benchmarks compare baseline.json current.json``.
+"""
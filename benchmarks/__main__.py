@@ -0,0 +1,62 @@
+# benchmarks/__main__.py
+import argparse
+import logging
+import sys
+
+from benchmarks.cases import CASES
+from benchmarks.harness import compare, load, run_suite, save
+
+
+DEFAULT_SIZES = "156,1560,15600"
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="MMM benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Run the suite and write results to JSON")
+    run.add_argument("--sizes", default=DEFAULT_SIZES, help="Comma-separated row counts")
+    run.add_argument("--cases", default=None, help=f"Comma-separated subset of: {', '.join(CASES)}")
+    run.add_argument("--repeat", type=int, default=5)
+    run.add_argument("--output", default="benchmark_results.json")
+    run.add_argument("--baseline", default=None, help="Compare against this results file")
+    run.add_argument("--threshold", type=float, default=0.1)
+
+    cmp = commands.add_parser("compare", help="Flag regressions between two result files")
+    cmp.add_argument("baseline")
+    cmp.add_argument("current")
+    cmp.add_argument("--threshold", type=float, default=0.1, help="Relative slowdown tolerated")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        # Pipeline logging would dominate the output
+        logging.disable(logging.INFO)
+
+        cases = args.cases.split(",") if args.cases else None
+        unknown = set(cases or []) - set(CASES)
+        if unknown:
+            parser.error(f"Unknown cases: {', '.join(sorted(unknown))}")
+
+        sizes = [int(s) for s in args.sizes.split(",")]
+        results = run_suite(sizes, cases, repeat=args.repeat)
+        save(results, args.output)
+        print(f"Results written to {args.output}")
+
+        if args.baseline is None:
+            return 0
+        baseline, current = load(args.baseline), results
+    else:
+        baseline, current = load(args.baseline), load(args.current)
+
+    regressions = compare(baseline, current, threshold=args.threshold)
+    if regressions:
+        print(f"{len(regressions)} regression(s) above {args.threshold:.0%}")
+        return 1
+
+    print("No regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
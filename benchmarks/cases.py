@@ -0,0 +1,169 @@
+# benchmarks/cases.py
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import Ridge
+
+from pipelines.forecast_pipeline import ForecastPipeline
+from pipelines.train_pipeline import TrainPipeline
+from src.evaluation.roi import ROIAnalyzer
+from src.features.adstock import adstock_geometric
+from src.features.feature_builder import MediaFeatureBuilder
+from src.features.saturation import hill_saturation
+from src.ingestion.generator import PANEL_TRUTH, generate_marketing_data, generate_panel_shard
+from src.models.forecasting import DemandForecaster
+from src.models.registry import save_artifact
+from src.simulation.scenarios import ScenarioSimulator
+from src.utils import config_loader as config
+
+
+# Single-series cases need a valid weekly calendar, which limits their length
+MAX_SERIES_WEEKS = 30_000
+SERIES_START = "1700-01-03"
+
+SCENARIOS = {
+    "TV -> Search (20%)": {"tv_spend": -0.2, "search_spend": 0.2},
+    "Social +30%": {"social_spend": 0.3},
+    "Digital -10%": {"digital_spend": -0.1},
+    "All +10%": {c: 0.1 for c in config.CHANNEL_PARAMS},
+}
+
+
+def _series(rows: int) -> pd.DataFrame:
+    return generate_marketing_data(start_date=SERIES_START, n_weeks=rows, seed=42)
+
+
+def _panel(rows: int) -> pd.DataFrame:
+    n_weeks = min(rows, 156)
+    n_geos = -(-rows // n_weeks)
+    df = generate_panel_shard(np.random.default_rng(42), list(range(n_geos)), 1, n_weeks)
+    return df.iloc[:rows]
+
+
+def _fit_mmm(df: pd.DataFrame):
+    df_mmm = MediaFeatureBuilder(config.CHANNEL_PARAMS).transform(df)
+    model = Ridge(alpha=1.0).fit(df_mmm[config.FEATURES_MMM], df_mmm["sales"])
+    return model, df_mmm
+
+
+# -------------------------
+# Cases: setup(rows) -> zero-argument callable timed by the harness.
+# The callable may carry ``reset`` (run untimed before every call) and
+# ``close`` (run once after the case) attributes.
+# -------------------------
+def adstock(rows: int):
+    spend = np.random.default_rng(0).gamma(5, 20, rows)
+    return lambda: adstock_geometric(spend, decay=0.6)
+
+
+def saturation(rows: int):
+    values = np.random.default_rng(0).gamma(5, 20, rows)
+    return lambda: hill_saturation(values, gamma=0.5)
+
+
+def feature_transform(rows: int):
+    df = _series(rows) if rows <= MAX_SERIES_WEEKS else _panel(rows)
+    builder = MediaFeatureBuilder(config.CHANNEL_PARAMS)
+    return lambda: builder.transform(df)
+
+
+def panel_transform(rows: int):
+    df = _panel(rows)
+    builder = MediaFeatureBuilder(PANEL_TRUTH["channel_params"])
+    return lambda: builder.transform(df, group_by="geo", time_col="date")
+
+
+def train_pipeline(rows: int):
+    tmp = tempfile.TemporaryDirectory(prefix="mmm-bench-")
+    workdir = tmp.name
+    data_path = os.path.join(workdir, "data.csv")
+    _series(rows).to_csv(data_path, index=False)
+
+    def reset():
+        # Every call trains into an empty artifacts/registry root
+        shutil.rmtree(os.path.join(workdir, "artifacts"), ignore_errors=True)
+
+    def run():
+        cwd = os.getcwd()
+        os.chdir(workdir)
+        try:
+            TrainPipeline(
+                data_path=data_path,
+                channel_params=config.CHANNEL_PARAMS,
+                features_mmm=config.FEATURES_MMM,
+                baseline_features=config.BASELINE_FEATURES,
+            ).run()
+        finally:
+            os.chdir(cwd)
+
+    run.reset = reset
+    run.close = tmp.cleanup
+    return run
+
+
+def compare_scenarios(rows: int):
+    model, df_mmm = _fit_mmm(_series(rows))
+    simulator = ScenarioSimulator(model, df_mmm, config.CHANNEL_PARAMS, config.FEATURES_MMM)
+    return lambda: simulator.compare_scenarios(SCENARIOS)
+
+
+def simulate_roi_all(rows: int):
+    model, df_mmm = _fit_mmm(_series(rows))
+    analyzer = ROIAnalyzer(model, df_mmm, config.CHANNEL_PARAMS, config.FEATURES_MMM)
+    channels = list(config.CHANNEL_PARAMS)
+    return lambda: analyzer.simulate_roi_all(channels, increase_pct=0.1)
+
+
+def roi_curves(rows: int):
+    model, df_mmm = _fit_mmm(_series(rows))
+    analyzer = ROIAnalyzer(model, df_mmm, config.CHANNEL_PARAMS, config.FEATURES_MMM)
+    levels = np.linspace(-0.5, 1.0, 16)
+    return lambda: analyzer.roi_matrix(increase_pcts=levels[levels != 0])
+
+
+def forecast_pipeline(rows: int):
+    df = _series(rows)
+    model, _ = _fit_mmm(df)
+
+    tmp = tempfile.TemporaryDirectory(prefix="mmm-bench-")
+    forecaster = DemandForecaster(
+        baseline_features=config.BASELINE_FEATURES,
+        mmm_model=model,
+        channel_params=config.CHANNEL_PARAMS,
+        features_mmm=config.FEATURES_MMM,
+    ).fit(df)
+
+    forecaster_path = os.path.join(tmp.name, "demand_forecaster.pkl")
+    save_artifact(forecaster, forecaster_path)
+
+    pipeline = ForecastPipeline(
+        channel_params=config.CHANNEL_PARAMS,
+        baseline_features=config.BASELINE_FEATURES,
+        features_mmm=config.FEATURES_MMM,
+        forecaster_path=forecaster_path,
+    )
+    spend = {c: df[c].mean() for c in config.CHANNEL_PARAMS}
+    future_df = forecaster.prepare_future_data(None, 12, spend)
+
+    def run():
+        return pipeline.run(future_df=future_df.copy())
+
+    run.close = tmp.cleanup
+    return run
+
+
+# name -> (setup, single-series case limited to MAX_SERIES_WEEKS rows)
+CASES = {
+    "adstock_geometric": (adstock, False),
+    "hill_saturation": (saturation, False),
+    "feature_transform": (feature_transform, False),
+    "panel_transform": (panel_transform, False),
+    "train_pipeline": (train_pipeline, True),
+    "compare_scenarios": (compare_scenarios, True),
+    "simulate_roi_all": (simulate_roi_all, True),
+    "roi_curves": (roi_curves, True),
+    "forecast_pipeline": (forecast_pipeline, True),
+}
@@ -0,0 +1,148 @@
+# benchmarks/harness.py
+import json
+import platform
+import subprocess
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.cases import CASES, MAX_SERIES_WEEKS
+
+
+def measure(fn, repeat: int = 5, warmup: int = 1) -> dict:
+    """
+    Wall time over ``repeat`` timed calls, and peak traced memory of
+    one extra call (tracing slows allocation, so it is not timed).
+    ``fn.reset``, if present, runs untimed before every call.
+    """
+    reset = getattr(fn, "reset", None) or (lambda: None)
+
+    for _ in range(warmup):
+        reset()
+        fn()
+
+    times = []
+    for _ in range(repeat):
+        reset()
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+
+    reset()
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "wall_s": min(times),
+        "wall_median_s": float(np.median(times)),
+        "peak_mb": peak / 2 ** 20,
+    }
+
+
+def _environment() -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+    }
+
+
+def run_suite(sizes: list, cases: list = None, repeat: int = 5, log=print) -> dict:
+    """
+    Run every case at every size
+
+    Returns
+    -------
+    dict
+        {"environment": ..., "results": [{case, rows, wall_s, ...}]}
+    """
+    results = []
+    for name in cases or list(CASES):
+        setup, series_only = CASES[name]
+        for rows in sizes:
+            if series_only and rows > MAX_SERIES_WEEKS:
+                log(f"{name:<20} {rows:>10}  skipped (single series > {MAX_SERIES_WEEKS} weeks)")
+                continue
+
+            fn = setup(rows)
+            try:
+                stats = measure(fn, repeat=repeat)
+            finally:
+                if hasattr(fn, "close"):
+                    fn.close()
+            stats.update({
+                "case": name,
+                "rows": rows,
+                "rows_per_s": rows / stats["wall_s"] if stats["wall_s"] > 0 else float("inf"),
+            })
+            results.append(stats)
+
+            log(
+                f"{name:<20} {rows:>10}  {stats['wall_s'] * 1000:>10.3f} ms"
+                f"  {stats['peak_mb']:>9.2f} MB  {stats['rows_per_s']:>14,.0f} rows/s"
+            )
+
+    return {"environment": _environment(), "results": results}
+
+
+def compare(baseline: dict, current: dict, threshold: float = 0.1, log=print) -> list:
+    """
+    Flag cases whose wall time or peak memory grew by more than
+    ``threshold`` (relative) against the baseline
+
+    Returns
+    -------
+    list
+        Regressions as (case, rows, metric, baseline, current)
+    """
+    reference = {(r["case"], r["rows"]): r for r in baseline["results"]}
+    regressions = []
+
+    for result in current["results"]:
+        key = (result["case"], result["rows"])
+        if key not in reference:
+            continue
+        base = reference[key]
+
+        flags = []
+        for metric in ("wall_s", "peak_mb"):
+            if base[metric] > 0 and result[metric] > base[metric] * (1 + threshold):
+                flags.append(metric)
+                regressions.append((*key, metric, base[metric], result[metric]))
+
+        ratio = result["wall_s"] / base["wall_s"] if base["wall_s"] > 0 else float("nan")
+        log(
+            f"{key[0]:<20} {key[1]:>10}  {ratio:>6.2f}x time"
+            f"  {result['peak_mb'] - base['peak_mb']:>+9.2f} MB"
+            f"  {'REGRESSION: ' + ', '.join(flags) if flags else 'ok'}"
+        )
+
+    return regressions
+
+
+def load(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def save(results: dict, path: str):
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
@@ -2,12 +2,13 @@ from pipelines.train_pipeline import TrainPipeline
 from pipelines.simulate_pipeline import SimulationPipeline
 from pipelines.forecast_pipeline import ForecastPipeline
 
+from src.features.feature_store import FeatureStore
 from src.ingestion.ingestion import DataIngestion
 from src.models.forecasting import DemandForecaster
+from src.utils import config_loader as config
+from src.utils import instrumentation
 from src.utils.logger import logger
 
-from pathlib import Path 
-
 logger = logger("MAIN")
 
 def main():
@@ -16,32 +17,13 @@ def main():
     # -------------------------
     # Common configuration
     # -------------------------
-    BASE_DIR = Path(__file__).resolve().parent
-    DATA_PATH = BASE_DIR / "data" / "raw" / "synthetic_mmm_data.csv"
-
-    channel_params = {
-        "tv_spend": {"decay": 0.6, "gamma": 0.5},
-        "digital_spend": {"decay": 0.4, "gamma": 0.6},
-        "search_spend": {"decay": 0.3, "gamma": 0.5},
-        "social_spend": {"decay": 0.5, "gamma": 0.4},
-    }
+    DATA_PATH = config.DATA_PATH
+    channel_params = config.CHANNEL_PARAMS
+    features_mmm = config.FEATURES_MMM
+    baseline_features = config.BASELINE_FEATURES
 
-    features_mmm = [
-        "tv_spend_adstock",
-        "digital_spend_adstock",
-        "search_spend_adstock",
-        "social_spend_adstock",
-        "promo_flag",
-        "holiday_flag",
-        "price_index",
-    ]
-
-    baseline_features = [
-        "price_index",
-        "promo_flag",
-        "holiday_flag",
-        "weekofyear",
-    ]
+    # Transformed media columns shared by all steps
+    feature_store = FeatureStore(max_mb=256)
 
     # -------------------------
     # STEP 1 — TRAIN
@@ -51,6 +33,9 @@ def main():
         channel_params=channel_params,
         features_mmm=features_mmm,
         alpha=1.0,
+        cache_dir=config.CACHE_DIR,
+        feature_store=feature_store,
+        baseline_features=baseline_features,
     )
 
     model, metrics = trainer.run()
@@ -59,7 +44,9 @@ def main():
     # -------------------------
     # Load data once
     # -------------------------
-    df = DataIngestion(DATA_PATH, "csv").load()
+    df = DataIngestion(
+        DATA_PATH, "csv", cache_dir=config.CACHE_DIR, parse_dates=["date"]
+    ).load()
 
     # -------------------------
     # STEP 2 — SIMULATION
@@ -73,6 +60,7 @@ def main():
         df=df.copy(),
         channel_params=channel_params,
         features_mmm=features_mmm,
+        feature_store=feature_store,
     )
 
     scenario_results = simulator.run(scenarios)
@@ -90,7 +78,11 @@ def main():
         features_mmm=features_mmm,
     )
 
-    demand_forecaster = DemandForecaster(baseline_features=baseline_features, channel_params=channel_params)
+    demand_forecaster = DemandForecaster(
+        baseline_features=baseline_features,
+        channel_params=channel_params,
+        feature_store=feature_store,
+    )
 
     # Prepare future data (next 12 weeks) with optimized spend
     optimized_spend = {
@@ -100,12 +92,26 @@ def main():
         "digital_spend": df_mmm["digital_spend"].mean() * 0.7
     }
 
-    future_df = demand_forecaster.prepare_future_data(df_mmm, future_weeks=12, optimized_spend=optimized_spend)
-    forecast = forecaster.run(df_mmm, future_df)
+    future_df = demand_forecaster.prepare_future_data(
+        df_mmm,
+        future_weeks=12,
+        optimized_spend=optimized_spend,
+        feature_state=trainer.feature_state_,
+    )
+    # The artifact saved by the trainer already matches this history
+    forecast = forecaster.run(future_df=future_df)
 
     logger.info("Forecasting completed")
+    logger.info(f"Feature store | hits: {feature_store.hits} | misses: {feature_store.misses}")
     print(forecast)
 
+    # Stage timings, collected when MMM_INSTRUMENTATION=1
+    if instrumentation.is_enabled():
+        instrumentation.to_json("artifacts/instrumentation.json")
+        with open("artifacts/instrumentation.prom", "w") as f:
+            f.write(instrumentation.to_prometheus())
+        logger.info("Stage timings saved to artifacts/instrumentation.json")
+
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
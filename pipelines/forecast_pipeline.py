@@ -1,17 +1,21 @@
-import joblib
 import pandas as pd
-import numpy as np
+from pathlib import Path
 
-from sklearn.linear_model import LinearRegression
-
-from src.features.adstock import adstock_geometric
-from src.features.saturation import hill_saturation
+from src.models.forecasting import DemandForecaster
+from src.models.registry import load_artifact
+from src.utils.instrumentation import span
 from src.utils.logger import logger
 
 
 class ForecastPipeline:
     """
     Demand forecasting pipeline with MMM uplift
+
+    Serves forecasts from the forecaster artifact written by
+    ``TrainPipeline`` (baseline model, MMM and feature state). The
+    baseline is refitted only when the history passed in, or the
+    features and channel parameters, differ from the ones the artifact
+    was fitted with.
     """
 
     def __init__(
@@ -19,54 +23,105 @@ class ForecastPipeline:
         channel_params: dict,
         baseline_features: list,
         features_mmm: list,
-        model_path: str = "artifacts/ridge_mmm_model.pkl"
+        model_path: str = "artifacts/ridge_mmm_model.pkl",
+        forecaster_path: str = "artifacts/demand_forecaster.pkl"
     ):
         self.channel_params = channel_params
         self.baseline_features = baseline_features
         self.features_mmm = features_mmm
         self.model_path = model_path
+        self.forecaster_path = forecaster_path
+
+        # Forecaster refitted on new history, keyed by its data fingerprint
+        self._refitted = None
 
         self.logger = logger(self.__class__.__name__)
 
+    def load_forecaster(self, historical_df: pd.DataFrame = None) -> DemandForecaster:
+        """
+        Forecaster for ``historical_df`` (default: the training data)
+
+        Checking a given history hashes all of its rows; on a hot path
+        with unchanged history pass ``historical_df=None`` to use the
+        artifact directly.
+        """
+        if Path(self.forecaster_path).exists():
+            forecaster = load_artifact(self.forecaster_path)
+        else:
+            forecaster = None
+
+        if historical_df is None:
+            if forecaster is None:
+                raise FileNotFoundError(
+                    f"No forecaster artifact at {self.forecaster_path}"
+                )
+            if not self._matches(forecaster):
+                raise ValueError(
+                    f"Forecaster artifact at {self.forecaster_path} was fitted with other "
+                    f"features or channel parameters; pass historical_df to refit"
+                )
+            return forecaster
+
+        fingerprint = DemandForecaster(
+            self.baseline_features,
+            channel_params=self.channel_params,
+            features_mmm=self.features_mmm,
+        ).fingerprint(historical_df)
+
+        if forecaster is not None and forecaster.data_fingerprint == fingerprint:
+            return forecaster
+
+        if self._refitted is None or self._refitted.data_fingerprint != fingerprint:
+            self.logger.info("History changed since training, refitting baseline")
+            self._refitted = self._new_forecaster(forecaster).fit(historical_df)
+
+        return self._refitted
+
+    def _matches(self, forecaster: DemandForecaster) -> bool:
+        return (
+            list(forecaster.baseline_features) == list(self.baseline_features)
+            and list(forecaster.features_mmm or []) == list(self.features_mmm or [])
+            and forecaster.channel_params == self.channel_params
+        )
+
+    def _new_forecaster(self, artifact) -> DemandForecaster:
+        mmm_model = artifact.mmm_model if artifact is not None else load_artifact(self.model_path)
+        return DemandForecaster(
+            baseline_features=self.baseline_features,
+            mmm_model=mmm_model,
+            channel_params=self.channel_params,
+            features_mmm=self.features_mmm,
+        )
+
     def run(
         self,
-        historical_df: pd.DataFrame,
-        future_df: pd.DataFrame
+        historical_df: pd.DataFrame = None,
+        future_df: pd.DataFrame = None
     ) -> pd.DataFrame:
-        self.logger.info("Forecast pipeline started")
+        """
+        Forecast ``future_df`` with the saved forecaster
+
+        Parameters
+        ----------
+        historical_df : pd.DataFrame, optional
+            History to refresh the forecaster against (hashed in full, and
+            the baseline refitted if it changed). Leave None to serve from
+            the artifact at a cost independent of the history length.
+        future_df : pd.DataFrame
+            Future weeks with baseline and MMM features
+        """
+        if future_df is None:
+            raise ValueError("future_df is required")
 
-        # Load MMM model
-        mmm_model = joblib.load(self.model_path)
-
-        historical_df["date"] = pd.to_datetime(historical_df["date"], dayfirst=True)
-        historical_df["weekofyear"] = historical_df["date"].dt.isocalendar().week
-
-        # Train baseline demand model
-        baseline_model = LinearRegression()
-        baseline_model.fit(
-            historical_df[self.baseline_features],
-            historical_df["sales"]
-        )
-
-        # Apply adstock to future data
-        # for channel, params in self.channel_params.items():
-        #     adstocked = adstock_geometric(
-        #         np.concatenate([historical_df[channel].values, future_df[channel].values]),
-        #         decay=params["decay"]
-        #     )[-len(future_df):]
+        self.logger.info("Forecast pipeline started")
 
-        #     future_df[f"{channel}_adstock"] = hill_saturation(adstocked, gamma=params["gamma"])
+        with span("forecast.load"):
+            forecaster = self.load_forecaster(historical_df)
 
         # Forecast
-        future_base = baseline_model.predict(
-            future_df[self.baseline_features]
-        )
-        future_uplift = mmm_model.predict(
-            future_df[self.features_mmm]
-        )
-
-        future_df["forecast_sales"] = future_base + future_uplift
+        with span("forecast.predict", rows=len(future_df)):
+            future_df = forecaster.forecast(future_df)
 
         self.logger.info("Forecast pipeline completed")
 
-        return future_df[["date", "forecast_sales"]]
\ No newline at end of file
+        return future_df[["date", "forecast_sales"]]
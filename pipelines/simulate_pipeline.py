@@ -1,8 +1,10 @@
-import joblib
 import pandas as pd
 
 from src.features.feature_builder import MediaFeatureBuilder
+from src.features.feature_store import FeatureStore
 from src.simulation.scenarios import ScenarioSimulator
+from src.models.registry import load_artifact
+from src.utils.instrumentation import span
 from src.utils.logger import logger
 
 
@@ -16,12 +18,14 @@ class SimulationPipeline:
         df: pd.DataFrame,
         channel_params: dict,
         features_mmm: list,
-        model_path: str = "artifacts/ridge_mmm_model.pkl"
+        model_path: str = "artifacts/ridge_mmm_model.pkl",
+        feature_store: FeatureStore = None
     ):
         self.df = df
         self.channel_params = channel_params
         self.features_mmm = features_mmm
         self.model_path = model_path
+        self.feature_store = feature_store
 
         self.logger = logger(self.__class__.__name__)
 
@@ -29,40 +33,31 @@ class SimulationPipeline:
         self.logger.info("Simulation pipeline started")
 
         # Load model
-        model = joblib.load(self.model_path)
+        model = load_artifact(self.model_path)
 
         # Feature engineering
-        builder = MediaFeatureBuilder(self.channel_params)
-        df_mmm = builder.transform(self.df)
-
-        baseline_sales = model.predict(df_mmm[self.features_mmm]).sum()
-
-        results = []
+        with span("simulate.features", rows=len(self.df)):
+            builder = MediaFeatureBuilder(self.channel_params, store=self.feature_store)
+            df_mmm = builder.transform(self.df)
 
         simulator = ScenarioSimulator(
             model=model,
             df=df_mmm,
             channel_params=self.channel_params,
             features=self.features_mmm,
+            feature_store=self.feature_store,
         )
 
-        for scenario_name, changes in scenarios.items():
-            scenario_dict = {scenario_name: changes}
-            scenario_df = simulator.compare_scenarios(scenario_dict)
-
-            self.logger.info(f"scenario_dict: {scenario_dict}")
-            self.logger.info(f"scenario_df: {scenario_df}")
+        # All scenarios are evaluated in one batched call
+        with span("simulate.scenarios", rows=len(scenarios)):
+            scenario_df = simulator.compare_scenarios(scenarios)
 
-            for _, row in scenario_df.iterrows():
-                results.append({
-                    "scenario": row["Scenario"],
-                    "sales_lift": row["Sales Lift"]
-                })
-
-        result_df = pd.DataFrame(results).sort_values(
-            by="sales_lift", ascending=False
-        )
+        result_df = pd.DataFrame({
+            "scenario": scenario_df["Scenario"].to_numpy(),
+            "sales_lift": scenario_df["Sales Lift"].to_numpy()
+        })
 
+        self.logger.info(f"Simulated {len(result_df)} scenarios")
         self.logger.info("Simulation pipeline completed")
 
         return result_df
\ No newline at end of file
@@ -1,5 +1,6 @@
-import pandas as pd
 import joblib
+import numpy as np
+import pandas as pd
 from pathlib import Path
 
 from sklearn.model_selection import train_test_split
@@ -7,7 +8,18 @@ from sklearn.linear_model import Ridge
 
 from src.ingestion.ingestion import DataIngestion
 from src.features.feature_builder import MediaFeatureBuilder
+from src.features.feature_store import FeatureStore
 from src.evaluation.metrics import RegressionMetrics
+from src.models.forecasting import DemandForecaster
+from src.models.incremental import IncrementalRidge
+from src.models.registry import ModelRegistry
+from src.models.ridge_solver import select_alpha
+from src.models.tuning import AdstockGridSearch
+from src.models.validation import RollingOriginCV
+from src.simulation.scenarios import ScenarioSimulator
+from src.simulation.response_curves import ResponseCurveIndex
+from src.utils.dates import parse_dates
+from src.utils.instrumentation import span
 from src.utils.logger import logger
 
 
@@ -23,7 +35,11 @@ class TrainPipeline:
         features_mmm: list,
         target: str = "sales",
         alpha: float = 1.0,
-        test_size: float = 0.2
+        test_size: float = 0.2,
+        cache_dir: str = None,
+        feature_store: FeatureStore = None,
+        baseline_features: list = None,
+        alphas: list = None
     ):
         self.data_path = data_path
         self.channel_params = channel_params
@@ -31,6 +47,12 @@ class TrainPipeline:
         self.target = target
         self.alpha = alpha
         self.test_size = test_size
+        self.cache_dir = cache_dir
+        self.feature_store = feature_store
+        self.baseline_features = baseline_features
+        self.alphas = alphas
+        self.feature_state_ = None
+        self.alpha_path_ = None
 
         self.logger = logger(self.__class__.__name__)
 
@@ -38,11 +60,16 @@ class TrainPipeline:
         self.logger.info("Training pipeline started")
 
         # Load data
-        df = DataIngestion(self.data_path, "csv").load()
+        with span("train.ingest") as s:
+            df = DataIngestion(
+                self.data_path, "csv", cache_dir=self.cache_dir, parse_dates=["date"]
+            ).load()
+            s.rows = len(df)
 
         # Feature engineering
-        builder = MediaFeatureBuilder(self.channel_params)
-        df_mmm = builder.transform(df)
+        with span("train.features", rows=len(df)):
+            builder = MediaFeatureBuilder(self.channel_params, store=self.feature_store)
+            df_mmm = builder.transform(df)
 
         # Train-test split
         X = df_mmm[self.features_mmm]
@@ -52,24 +79,77 @@ class TrainPipeline:
             X, y, test_size=self.test_size, shuffle=False
         )
 
+        # Pick alpha from the regularization path (one SVD), validated on
+        # the tail of the training window
+        if self.alphas is not None:
+            with span("train.alpha_path", rows=len(X_train)):
+                self.alpha, self.alpha_path_ = select_alpha(
+                    X_train, y_train, self.alphas, val_size=self.test_size
+                )
+            self.logger.info(
+                f"Selected alpha {self.alpha} from {len(self.alphas)} candidates"
+            )
+
         # Train model
-        model = Ridge(alpha=self.alpha)
-        model.fit(X_train, y_train)
+        with span("train.fit", rows=len(X_train)):
+            model = Ridge(alpha=self.alpha)
+            model.fit(X_train, y_train)
 
         # Evaluation
-        y_pred = model.predict(X_test)
-        metrics = RegressionMetrics.evaluate(y_test, y_pred)
+        with span("train.predict", rows=len(X_test)):
+            y_pred = model.predict(X_test)
+            metrics = RegressionMetrics.evaluate(y_test, y_pred)
 
         self.logger.info(f"Model evaluation: {metrics}")
 
         ARTIFACTS_DIR = Path("artifacts")
         ARTIFACTS_DIR.mkdir(parents=True, exist_ok=True)
 
-        model_path = ARTIFACTS_DIR / "ridge_mmm_model.pkl"
-        joblib.dump(model, model_path)
+        # Save artifacts: versioned copy in the registry, exposed at the
+        # stable path the simulation / forecast pipelines load from
+        registry = ModelRegistry(ARTIFACTS_DIR / "registry")
+        entry = registry.register(
+            "ridge_mmm_model",
+            model,
+            metadata={
+                "alpha": self.alpha,
+                "features": self.features_mmm,
+                "channel_params": self.channel_params,
+                "metrics": {k: float(v) for k, v in metrics.items()},
+            }
+        )
+        registry.publish("ridge_mmm_model", ARTIFACTS_DIR / "ridge_mmm_model.pkl")
 
-        # Save artifacts
-        joblib.dump(model, "artifacts/ridge_mmm_model.pkl")
+        # Adstock carryover at the end of the data, saved with the model so
+        # forecasts and weekly updates continue from it
+        self.feature_state_ = builder.state_
+        registry.register(
+            "feature_state",
+            self.feature_state_,
+            metadata={"model_version": entry["version"], "n_rows": self.feature_state_.n_rows}
+        )
+        registry.publish("feature_state", ARTIFACTS_DIR / "feature_state.pkl")
+
+        # Forecast artifact (baseline model + MMM + feature state), served
+        # by ForecastPipeline without refitting
+        if self.baseline_features is not None:
+            forecaster = DemandForecaster(
+                baseline_features=self.baseline_features,
+                mmm_model=model,
+                channel_params=self.channel_params,
+                features_mmm=self.features_mmm,
+                feature_store=self.feature_store,
+            ).fit(df, self.target)
+
+            registry.register(
+                "demand_forecaster",
+                forecaster,
+                metadata={
+                    "model_version": entry["version"],
+                    "data_fingerprint": forecaster.data_fingerprint,
+                }
+            )
+            registry.publish("demand_forecaster", ARTIFACTS_DIR / "demand_forecaster.pkl")
 
         coef_df = pd.DataFrame({
             "feature": X.columns,
@@ -78,6 +158,285 @@ class TrainPipeline:
 
         coef_df.to_csv("artifacts/mmm_coefficients.csv", index=False)
 
+        # Response curves for fast what-if queries
+        with span("train.response_curves", rows=len(df_mmm)):
+            simulator = ScenarioSimulator(
+                model=model,
+                df=df_mmm,
+                channel_params=self.channel_params,
+                features=self.features_mmm,
+                feature_store=self.feature_store,
+            )
+            curves = ResponseCurveIndex.from_simulator(simulator)
+            curves.save(ARTIFACTS_DIR / "response_curves.npz")
+
+        self.logger.info(
+            f"Response curves saved | Error bound: {curves.error_bound():.4f}"
+        )
+
         self.logger.info("Training pipeline completed")
 
-        return model, metrics
\ No newline at end of file
+        return model, metrics
+
+    def run_incremental(
+        self,
+        chunksize: int = 100_000,
+        group_by=None,
+        time_col: str = None
+    ):
+        """
+        Train an ``IncrementalRidge`` MMM by streaming the data in chunks
+
+        Features are built chunk by chunk with adstock carried across
+        chunk boundaries, and each chunk is folded into the model's
+        sufficient statistics, so memory is bounded by the chunk size
+        plus O(features²). ``data_path`` may be a single file or a
+        directory of part files. The model and its feature state are
+        published like in ``run`` and can be updated with ``update``.
+
+        Parameters
+        ----------
+        chunksize : int
+            Maximum rows per chunk
+        group_by : str or list, optional
+            Series columns of a panel (e.g. ["geo", "product"] for
+            ``generate_panel`` output); adstock is carried per series and
+            reset at series boundaries. Rows of each series must arrive in
+            chronological order across chunks.
+        time_col : str, optional
+            Column ordering rows within each series of a chunk
+
+        Returns
+        -------
+        IncrementalRidge
+        """
+        self.logger.info("Incremental training started")
+
+        ingestion = DataIngestion(self.data_path, parse_dates=["date"])
+        builder = MediaFeatureBuilder(self.channel_params)
+
+        with span("train.fit_incremental") as s:
+            model = IncrementalRidge(alpha=self.alpha).fit_chunks(
+                builder.transform_chunks(ingestion.iter_chunks(chunksize), group_by, time_col),
+                self.features_mmm,
+                self.target,
+            )
+            s.rows = model.n_samples_seen_
+
+        self.feature_state_ = builder.state_
+        self._publish_incremental(model)
+
+        self.logger.info(
+            f"Incremental training completed | Rows: {model.n_samples_seen_}"
+        )
+
+        return model
+
+    def update(
+        self,
+        new_df: pd.DataFrame,
+        model_path: str = "artifacts/ridge_mmm_model.pkl",
+        state_path: str = "artifacts/feature_state.pkl"
+    ):
+        """
+        Fold newly observed weeks into the published incremental model
+
+        Features of ``new_df`` continue from the saved adstock carryover
+        (per series for a panel, using the ``group_by`` / ``time_col``
+        recorded in the feature state) and only the new rows are added to
+        the model, so history is not re-read. The updated model and
+        feature state are re-published; see ``_publish_incremental`` for
+        the forecaster artifact.
+
+        Parameters
+        ----------
+        new_df : pd.DataFrame
+            Weeks after the data the model was trained on, with raw spend,
+            the model's other features and the target (and the series
+            columns for a panel)
+        model_path, state_path : str
+            Published model and feature state to update
+
+        Returns
+        -------
+        IncrementalRidge
+        """
+        # Private, writable copies: both objects are modified in place
+        model = joblib.load(model_path)
+        if not isinstance(model, IncrementalRidge):
+            raise TypeError(
+                f"{model_path} holds a {type(model).__name__}, "
+                f"update() requires a model trained with run_incremental()"
+            )
+
+        state = joblib.load(state_path)
+        df = new_df.copy()
+        if "date" in df and not pd.api.types.is_datetime64_any_dtype(df["date"]):
+            df["date"] = parse_dates(df["date"])
+
+        with span("train.update", rows=len(df)):
+            df_mmm = state.extend(df)
+            model.partial_fit(df_mmm[self.features_mmm], df_mmm[self.target])
+
+        self.feature_state_ = state
+        self._publish_incremental(model)
+
+        self.logger.info(
+            f"Model updated with {len(df)} rows | Total rows: {model.n_samples_seen_}"
+        )
+
+        return model
+
+    def _publish_incremental(self, model: IncrementalRidge):
+        """
+        Register and publish the model and feature state. A published
+        single-series forecaster is re-published with the new MMM and
+        carryover; its baseline model is kept until the next ``run``
+        (``ForecastPipeline`` refits it when given newer history).
+        """
+        ARTIFACTS_DIR = Path("artifacts")
+        ARTIFACTS_DIR.mkdir(parents=True, exist_ok=True)
+
+        registry = ModelRegistry(ARTIFACTS_DIR / "registry")
+        entry = registry.register(
+            "ridge_mmm_model",
+            model,
+            metadata={
+                "alpha": self.alpha,
+                "features": self.features_mmm,
+                "channel_params": self.channel_params,
+                "n_rows": int(model.n_samples_seen_),
+            }
+        )
+        registry.publish("ridge_mmm_model", ARTIFACTS_DIR / "ridge_mmm_model.pkl")
+
+        registry.register(
+            "feature_state",
+            self.feature_state_,
+            metadata={"model_version": entry["version"], "n_rows": self.feature_state_.n_rows}
+        )
+        registry.publish("feature_state", ARTIFACTS_DIR / "feature_state.pkl")
+
+        forecaster_path = ARTIFACTS_DIR / "demand_forecaster.pkl"
+        if not forecaster_path.exists():
+            return
+
+        if self.feature_state_.group_by is not None:
+            self.logger.warning(
+                f"{forecaster_path} was not updated: forecasts need a single-series model"
+            )
+            return
+
+        forecaster = joblib.load(forecaster_path)
+        forecaster.mmm_model = model
+        forecaster.feature_state = self.feature_state_
+        registry.register(
+            "demand_forecaster",
+            forecaster,
+            metadata={
+                "model_version": entry["version"],
+                "data_fingerprint": forecaster.data_fingerprint,
+            }
+        )
+        registry.publish("demand_forecaster", forecaster_path)
+
+    def tune(self, grid: dict, n_rounds: int = 2, n_jobs: int = -1):
+        """
+        Search adstock decay / Hill gamma per channel
+
+        Parameters
+        ----------
+        grid : dict
+            Candidate values per channel, e.g.
+            {"tv_spend": {"decay": np.linspace(0.1, 0.9, 50),
+                          "gamma": np.linspace(0.2, 1.0, 50)}}
+        n_rounds : int
+            Number of coordinate passes over the channels
+        n_jobs : int
+            Number of parallel workers
+
+        Returns
+        -------
+        tuple
+            (best channel_params, DataFrame of every scored candidate)
+        """
+        self.logger.info("Hyperparameter search started")
+
+        df = DataIngestion(
+            self.data_path, "csv", cache_dir=self.cache_dir, parse_dates=["date"]
+        ).load()
+        n_train = len(df) - int(np.ceil(self.test_size * len(df)))
+
+        search = AdstockGridSearch(
+            channel_params=self.channel_params,
+            features=self.features_mmm,
+            alpha=self.alpha,
+            n_rounds=n_rounds,
+            n_jobs=n_jobs,
+        ).fit(df, self.target, grid, n_train)
+
+        # Subsequent run() calls train with the tuned parameters
+        self.channel_params = search.best_params_
+
+        self.logger.info(
+            f"Hyperparameter search completed | Best RMSE: {search.best_score_:.2f}"
+        )
+
+        return search.best_params_, search.results_
+
+    def cross_validate(
+        self,
+        n_folds: int = 5,
+        horizon: int = None,
+        step: int = None,
+        alphas: list = None,
+        n_jobs: int = -1
+    ):
+        """
+        Rolling-origin cross-validation of the Ridge MMM
+
+        Parameters
+        ----------
+        n_folds : int
+            Number of forecast origins
+        horizon : int, optional
+            Weeks per test window (default: n_rows // (n_folds + 1))
+        step : int, optional
+            Weeks between consecutive origins (default: horizon)
+        alphas : list, optional
+            Ridge strengths to compare (default: the pipeline's alphas,
+            or its single alpha)
+        n_jobs : int
+            Number of parallel workers
+
+        Returns
+        -------
+        tuple
+            (best alpha, DataFrame of per-fold metrics)
+        """
+        self.logger.info("Cross-validation started")
+
+        with span("train.ingest") as s:
+            df = DataIngestion(
+                self.data_path, "csv", cache_dir=self.cache_dir, parse_dates=["date"]
+            ).load()
+            s.rows = len(df)
+
+        with span("train.features", rows=len(df)):
+            df_mmm = MediaFeatureBuilder(self.channel_params, store=self.feature_store).transform(df)
+
+        with span("train.cross_validate", rows=len(df_mmm)):
+            cv = RollingOriginCV(
+                n_folds=n_folds,
+                horizon=horizon,
+                step=step,
+                alphas=alphas or self.alphas or [self.alpha],
+                n_jobs=n_jobs,
+            ).fit(df_mmm[self.features_mmm], df_mmm[self.target])
+
+        # Subsequent run() calls train with the selected alpha
+        self.alpha = cv.best_alpha_
+
+        self.logger.info(f"Cross-validation completed | Best alpha: {cv.best_alpha_}")
+
+        return cv.best_alpha_, cv.results_
@@ -1,6 +1,10 @@
+import numpy as np
 import pandas as pd
-from src.features.adstock import adstock_geometric
+from src.features.adstock import adstock_geometric_matrix
+from src.features.feature_store import FeatureStore
 from src.features.saturation import hill_saturation
+from src.simulation.scenarios import ScenarioSimulator
+from src.utils.instrumentation import instrumented
 
 
 class ROIAnalyzer:
@@ -8,7 +12,14 @@ class ROIAnalyzer:
     ROI and incremental sales analysis for marketing channels
     """
 
-    def __init__(self, model, df: pd.DataFrame, channel_params: dict, features: list):
+    def __init__(
+        self,
+        model,
+        df: pd.DataFrame,
+        channel_params: dict,
+        features: list,
+        feature_store: FeatureStore = None
+    ):
         """
         Parameters
         ----------
@@ -19,11 +30,15 @@ class ROIAnalyzer:
             Adstock + saturation parameters per channel
         features : list
             Features used in model
+        feature_store : FeatureStore, optional
+            Memoizes the transformed columns of simulated spend
         """
         self.model = model
         self.df = df.copy()
         self.channel_params = channel_params
         self.features = features
+        self.feature_store = feature_store
+        self._simulator = None
 
     def incremental_sales(self, channel_cols: list) -> pd.DataFrame:
         """
@@ -50,39 +65,151 @@ class ROIAnalyzer:
         contrib_df["ROI"] = contrib_df["incremental_sales"] / contrib_df["total_spend"]
         return contrib_df
 
-    def simulate_roi(self, channel: str, increase_pct: float = 0.1) -> float:
+    @property
+    def simulator(self) -> ScenarioSimulator:
         """
-        Calculate ROI for a hypothetical increase in channel spend
+        Simulator shared by all ROI queries, so the baseline prediction
+        and the raw adstock of current spend are computed once
+        """
+        if self._simulator is None:
+            self._simulator = ScenarioSimulator(
+                model=self.model,
+                df=self.df,
+                channel_params=self.channel_params,
+                features=self.features,
+                feature_store=self.feature_store,
+            )
+        return self._simulator
+
+    def roi_matrix(
+        self,
+        channels: list = None,
+        increase_pcts=(0.1,),
+        max_buffer_mb: float = 256
+    ):
+        """
+        ROI of every channel at every spend increase, plus marginal ROI
+
+        ROI(channel, pct) is the sales lift of scaling that channel's
+        spend by (1 + pct) divided by the extra spend. Marginal ROI is the
+        derivative of sales with respect to spend at the current level.
+
+        For a linear MMM everything comes from the Hill-of-adstock
+        response in one vectorized pass (adstock is linear in spend, so
+        only the saturation is re-evaluated), and marginal ROI is exact:
+        coef * sum(adstock * hill'(adstock)) / total spend. Other models
+        are predicted once per channel on a stack of all levels, and
+        marginal ROI is a central difference.
+
+        Parameters
+        ----------
+        channels : list, optional
+            Channels to analyse (default: all channels in channel_params)
+        increase_pcts : sequence of float
+            Non-zero spend changes, e.g. [-0.2, 0.1, 0.5]
+        max_buffer_mb : float
+            Upper bound on the (levels x time x channels) working buffer
+
+        Returns
+        -------
+        tuple
+            (DataFrame of ROI, channels x increase_pcts;
+             Series of marginal ROI per channel)
+        """
+        channels = list(self.channel_params) if channels is None else list(channels)
+        for channel in channels:
+            if channel not in self.channel_params:
+                raise KeyError(channel)
+
+        levels = np.atleast_1d(np.asarray(increase_pcts, dtype=float))
+        if (levels == 0).any():
+            raise ValueError("Spend increases must be non-zero")
+
+        spend = self.df[channels].sum().to_numpy(dtype=float)
+
+        if self.simulator.is_linear:
+            lifts, marginal_lift = self._linear_response(channels, levels, max_buffer_mb)
+        else:
+            lifts, marginal_lift = self._predicted_response(channels, levels)
+
+        roi = lifts / (levels[None, :] * spend[:, None])
+
+        roi_df = pd.DataFrame(
+            roi, index=pd.Index(channels, name="channel"), columns=levels.tolist()
+        )
+        marginal = pd.Series(marginal_lift / spend, index=roi_df.index, name="marginal_ROI")
+
+        return roi_df, marginal
+
+    def _linear_response(self, channels, levels, max_buffer_mb):
+        """
+        (channels x levels) lifts and d lift / d multiplier at current spend
+        """
+        sim = self.simulator
+        idx = [sim.channels.index(c) for c in channels]
+
+        # Last row: current spend, for the gradient
+        multipliers = np.ones((len(levels) + 1, len(sim.channels)))
+        multipliers[:-1] += levels[:, None]
+
+        n_time = len(self.df)
+        chunk = max(1, int(max_buffer_mb * 2 ** 20 // (n_time * len(sim.channels) * 8)))
+
+        lifts = np.empty_like(multipliers)
+        grads = np.empty_like(multipliers)
+        for start in range(0, len(multipliers), chunk):
+            block = slice(start, start + chunk)
+            lifts[block], grads[block] = sim.channel_response(multipliers[block])
+
+        return lifts[:-1, idx].T, grads[-1, idx]
+
+    def _predicted_response(self, channels, levels, step: float = 1e-4):
+        """
+        Lifts from model predictions, for models that are not linear
         """
-        df_copy = self.df.copy()
+        sim = self.simulator
+        multipliers = np.concatenate([1 + levels, [1 + step, 1 - step]])
 
-        # Baseline sales
-        baseline_sales = self.model.predict(df_copy[self.features]).sum()
+        decays = np.array([self.channel_params[c].get("decay", 0.5) for c in channels])
+        raw = self.df[channels].to_numpy(dtype=float)
+        if self.feature_store is not None:
+            adstock, _ = self.feature_store.transform(raw, channels, decays)
+        else:
+            adstock = adstock_geometric_matrix(raw, decays)
 
-        # Increase spend
-        df_copy[channel] *= (1 + increase_pct)
+        X = self.df[self.features]
+        n_time = len(X)
 
-        # Recompute adstock and saturation
-        params = self.channel_params[channel]
-        adstocked = adstock_geometric(df_copy[channel].values, decay=params.get("decay", 0.5))
-        df_copy[f"{channel}_adstock"] = hill_saturation(adstocked, gamma=params.get("gamma", 0.5))
+        lifts = np.zeros((len(channels), len(multipliers)))
+        for i, channel in enumerate(channels):
+            column = f"{channel}_adstock"
+            if column not in self.features:
+                continue
 
-        # New prediction
-        new_sales = self.model.predict(df_copy[self.features]).sum()
+            gamma = self.channel_params[channel].get("gamma", 0.5)
+            scaled = hill_saturation(adstock[:, i, None] * multipliers, gamma=gamma)
 
-        # ROI
-        delta_sales = new_sales - baseline_sales
-        delta_spend = self.df[channel].sum() * increase_pct
+            # Every level of this channel in one prediction
+            X_sim = pd.concat([X] * len(multipliers), ignore_index=True)
+            X_sim[column] = scaled.T.ravel()
+            sales = np.asarray(self.model.predict(X_sim)).reshape(len(multipliers), n_time).sum(axis=1)
+            lifts[i] = sales - sim.baseline_sales
 
-        return delta_sales / delta_spend
+        marginal_lift = (lifts[:, -2] - lifts[:, -1]) / (2 * step)
+        return lifts[:, :-2], marginal_lift
+
+    def simulate_roi(self, channel: str, increase_pct: float = 0.1) -> float:
+        """
+        Calculate ROI for a hypothetical increase in channel spend
+        """
+        roi_df, _ = self.roi_matrix([channel], [increase_pct])
+        return float(roi_df.iloc[0, 0])
 
+    @instrumented("roi.simulate_roi_all", rows="channels")
     def simulate_roi_all(self, channels: list, increase_pct: float = 0.1) -> pd.DataFrame:
         """
         Simulate ROI for all channels
         """
-        roi_results = {}
-        for channel in channels:
-            roi_results[channel] = self.simulate_roi(channel, increase_pct)
+        roi_df, _ = self.roi_matrix(channels, [increase_pct])
 
-        roi_df = pd.DataFrame.from_dict(roi_results, orient="index", columns=["ROI"])
-        return roi_df
\ No newline at end of file
+        return pd.DataFrame({"ROI": roi_df.iloc[:, 0].to_numpy()}, index=list(roi_df.index))
@@ -1,6 +1,126 @@
 # src/features/adstock.py
 import numpy as np
 import pandas as pd
+from scipy.signal import lfilter
+
+
+# Below this many elements per distinct decay, per-call filter overhead
+# dominates and a single vectorized scan over all channels is faster
+_SCAN_MAX_ELEMENTS = 16384
+
+
+def _doubling_scan(spend, decays, axis, out, initial):
+    """
+    Blocked (doubling) scan of the adstock recurrence.
+
+    After the pass with offset k every element holds the decayed sum of
+    its last 2k inputs, so log2(time) vectorized passes cover the series
+    with a different decay per channel in each pass.
+    """
+    x = np.moveaxis(out, axis, 0)
+    x[...] = np.moveaxis(spend, axis, 0)
+
+    n_steps = x.shape[0]
+    power = decays.copy()
+    offset = 1
+    while offset < n_steps:
+        x[offset:] += power * x[:-offset]
+        power = power * power
+        offset *= 2
+
+    if initial is not None:
+        exponents = np.arange(1, n_steps + 1).reshape((n_steps,) + (1,) * (x.ndim - 1))
+        x += decays ** exponents * np.moveaxis(initial, axis, 0)
+
+    return out
+
+
+def adstock_geometric_matrix(
+    spend: np.ndarray,
+    decay,
+    axis: int = 0,
+    out: np.ndarray = None,
+    initial: np.ndarray = None
+) -> np.ndarray:
+    """
+    Applies geometric adstock to many channels at once.
+
+    The recurrence ``a[t] = x[t] + decay * a[t - 1]`` is evaluated as a
+    first-order IIR filter (``scipy.signal.lfilter``) along the time axis,
+    so the loop over time runs in compiled code. Channels sharing a decay
+    are filtered together in a single call; small arrays with many
+    distinct decays use a vectorized doubling scan instead.
+
+    Parameters
+    ----------
+    spend : np.ndarray
+        Media spend array with channels on the last axis,
+        e.g. (time x channels) or (series x time x channels)
+    decay : float or array-like
+        Decay factor per channel (0 < decay < 1). A scalar applies
+        the same decay to every channel.
+    axis : int
+        Time axis of ``spend``
+    out : np.ndarray, optional
+        Pre-allocated float64 buffer with the same shape as ``spend``
+    initial : np.ndarray, optional
+        Adstock value just before the first time step (carryover),
+        shaped like ``spend`` without the time axis. Defaults to zero.
+
+    Returns
+    -------
+    np.ndarray
+        Adstocked array (``out`` if provided)
+    """
+    spend = np.asarray(spend, dtype=float)
+    if spend.ndim == 0:
+        raise ValueError("spend must have at least one dimension")
+
+    axis = axis % spend.ndim
+    if spend.ndim > 1 and axis == spend.ndim - 1:
+        raise ValueError("Time axis cannot be the channel (last) axis")
+
+    n_channels = spend.shape[-1] if spend.ndim > 1 else 1
+    decays = np.broadcast_to(np.asarray(decay, dtype=float), (n_channels,))
+
+    if out is None:
+        out = np.empty_like(spend)
+    elif out.shape != spend.shape:
+        raise ValueError(
+            f"out has shape {out.shape}, expected {spend.shape}"
+        )
+
+    if initial is not None:
+        initial = np.expand_dims(
+            np.broadcast_to(
+                np.asarray(initial, dtype=float),
+                spend.shape[:axis] + spend.shape[axis + 1:]
+            ),
+            axis
+        )
+
+    def _filter(x, value, carry):
+        if carry is None:
+            return lfilter([1.0], [1.0, -value], x, axis=axis)
+        return lfilter([1.0], [1.0, -value], x, axis=axis, zi=value * carry)[0]
+
+    if spend.ndim == 1:
+        out[...] = _filter(spend, decays[0], initial)
+        return out
+
+    unique = np.unique(decays)
+    if len(unique) > 1 and spend.size // len(unique) < _SCAN_MAX_ELEMENTS:
+        return _doubling_scan(spend, decays, axis, out, initial)
+
+    for value in unique:
+        cols = np.flatnonzero(decays == value)
+        if len(cols) == n_channels:
+            out[...] = _filter(spend, value, initial)
+        else:
+            carry = None if initial is None else initial[..., cols]
+            out[..., cols] = _filter(spend[..., cols], value, carry)
+
+    return out
 
 
 def adstock_geometric(series: np.ndarray, decay: float = 0.5) -> np.ndarray:
@@ -19,10 +139,4 @@ def adstock_geometric(series: np.ndarray, decay: float = 0.5) -> np.ndarray:
     np.ndarray
         Adstocked series
     """
-    result = np.zeros_like(series, dtype=float)
-    for t in range(len(series)):
-        if t == 0:
-            result[t] = series[t]
-        else:
-            result[t] = series[t] + decay * result[t - 1]
-    return result
\ No newline at end of file
+    return adstock_geometric_matrix(np.asarray(series, dtype=float), decay)
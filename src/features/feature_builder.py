@@ -1,7 +1,11 @@
 # src/features/feature_builder.py
+import numpy as np
 import pandas as pd
-from src.features.adstock import adstock_geometric
+from src.features.adstock import adstock_geometric_matrix
+from src.features.feature_store import FeatureStore
 from src.features.saturation import hill_saturation
+from src.utils.dates import parse_dates
+from src.utils.instrumentation import instrumented
 
 
 class MediaFeatureBuilder:
@@ -9,27 +13,328 @@ class MediaFeatureBuilder:
     Builds adstocked and saturated features for marketing channels.
     """
 
-    def __init__(self, channel_params: dict):
+    def __init__(self, channel_params: dict, store: FeatureStore = None):
         """
         channel_params example:
         {
             "tv_spend": {"decay": 0.6, "gamma": 0.5},
             "digital_spend": {"decay": 0.4, "gamma": 0.6},
         }
+
+        store : FeatureStore, optional
+            Memoizes transformed columns of single-series data, so only
+            columns not seen before are computed
         """
         self.channel_params = channel_params
+        self.store = store
+        self.state_ = None
 
-    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+    @instrumented("features.transform", rows="df")
+    def transform(
+        self,
+        df: pd.DataFrame,
+        group_by=None,
+        time_col: str = None
+    ) -> pd.DataFrame:
         """
         Apply adstock + saturation to all channels
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+            Single time series, or a stacked panel when ``group_by`` is set
+        group_by : str or list, optional
+            Column(s) identifying each series (e.g. ["geo", "brand"]).
+            Adstock carryover is reset at every series boundary.
+        time_col : str, optional
+            Column used to order rows within each series. If None,
+            rows are assumed to already be in chronological order.
         """
         df = df.copy()
+        saturated, carry = self._apply(df, group_by, time_col)
+
+        for i, channel in enumerate(self.channel_params):
+            df[f"{channel}_adstock"] = saturated[:, i]
+
+        self.state_ = FeatureState(
+            self.channel_params, carry, group_by, _last_date(df), len(df), time_col
+        )
+
+        return df
+
+    def transform_chunks(
+        self,
+        chunks,
+        group_by=None,
+        time_col: str = None
+    ):
+        """
+        Apply adstock + saturation to a stream of chunks, e.g. from
+        ``DataIngestion.iter_chunks``.
+
+        The adstock value at the end of each chunk (per series for a
+        panel) is carried into the next one, so the output matches
+        ``transform`` on the concatenated data while only one chunk is
+        held in memory. Rows of a series must arrive in chronological
+        order across chunks; ``time_col`` orders rows within a chunk.
+
+        Feature columns are added to each chunk in place. Once the stream
+        is exhausted, ``state_`` holds the carryover at its end.
+
+        Yields
+        ------
+        pd.DataFrame
+        """
+        state = FeatureState(self.channel_params, None, group_by, time_col=time_col)
+        for chunk in chunks:
+            if chunk.empty:
+                continue
+
+            yield state.extend(chunk, time_col, inplace=True)
+
+        self.state_ = state
+
+    def _apply(self, df: pd.DataFrame, group_by, time_col: str, carry=None):
+        """
+        Saturated features for every row plus the raw adstock at the end
+        of the data: a (channels,) array for a single series, or a
+        {series key: array} dict for a panel. ``carry`` is the same
+        structure from a preceding chunk.
+        """
+        channels = list(self.channel_params)
+        decays = np.array([p.get("decay", 0.5) for p in self.channel_params.values()])
+        gammas = np.array([p.get("gamma", 0.5) for p in self.channel_params.values()])
+
+        spend = df[channels].to_numpy(dtype=float)
+
+        if len(spend) == 0:
+            if group_by is not None:
+                carry = {} if carry is None else dict(carry)
+            return np.empty((0, len(channels))), carry
+
+        if group_by is None:
+            if self.store is not None and carry is None:
+                adstocked, saturated = self.store.transform(spend, channels, decays, gammas)
+                return saturated, adstocked[-1].copy()
+
+            # All channels are adstocked in one (time x channels) pass
+            adstocked = adstock_geometric_matrix(spend, decays, initial=carry)
+            saturated = hill_saturation(adstocked, alpha=1, gamma=gammas)
+            return saturated, adstocked[-1].copy()
+
+        keys = [group_by] if isinstance(group_by, str) else list(group_by)
+        series = list(df[keys].drop_duplicates().itertuples(index=False, name=None))
+
+        carry = {} if carry is None else dict(carry)
+        initial = None
+        if carry:
+            initial = np.array([carry.get(key, np.zeros(len(channels))) for key in series])
+
+        saturated, last = self._transform_panel(
+            df, spend, keys, time_col, decays, gammas, initial
+        )
+        carry.update(zip(series, last))
+        return saturated, carry
+
+    @staticmethod
+    def _transform_panel(
+        df: pd.DataFrame,
+        spend: np.ndarray,
+        group_by,
+        time_col: str,
+        decays: np.ndarray,
+        gammas: np.ndarray,
+        initial: np.ndarray = None
+    ):
+        """
+        Adstock + saturation for a stacked panel in one vectorized pass.
+
+        Rows are sorted once, laid out as a (series x time x channels)
+        array (shorter series are zero-padded at the end, which does not
+        affect their values), filtered along the time axis and scattered
+        back to the original row order.
+
+        ``initial`` is the (series x channels) carry-in adstock, in order
+        of first appearance of each series. Returns the saturated features
+        and the (series x channels) raw adstock at each series' last row.
+        """
+        keys = [group_by] if isinstance(group_by, str) else list(group_by)
+        # Rows with a missing key would belong to no series (and could not
+        # be matched to their carry in the next chunk)
+        if df[keys].isna().to_numpy().any():
+            raise ValueError(f"Series columns {keys} contain missing values")
+        codes = df.groupby(keys, sort=False).ngroup().to_numpy()
+
+        if time_col is None:
+            order = np.argsort(codes, kind="stable")
+        else:
+            times = df[time_col]
+            if pd.api.types.is_string_dtype(times):
+                times = parse_dates(times)
+            order = np.lexsort((times.to_numpy(), codes))
+
+        sorted_codes = codes[order]
+        lengths = np.bincount(sorted_codes)
+        starts = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+        positions = np.arange(len(order)) - starts[sorted_codes]
+
+        n_series, n_steps = len(lengths), lengths.max()
+        if (lengths == n_steps).all():
+            panel = spend[order].reshape(n_series, n_steps, spend.shape[1])
+        else:
+            panel = np.zeros((n_series, n_steps, spend.shape[1]))
+            panel[sorted_codes, positions] = spend[order]
+
+        adstock_geometric_matrix(panel, decays, axis=1, out=panel, initial=initial)
+        last = panel[np.arange(n_series), lengths - 1]
+        panel = hill_saturation(panel, alpha=1, gamma=gammas)
+
+        saturated = np.empty_like(spend)
+        saturated[order] = panel[sorted_codes, positions]
+        return saturated, last
+
+
+def _last_date(df: pd.DataFrame, date_col: str = "date"):
+    # Only already-parsed dates are tracked; feature building never
+    # depends on the date column being parseable
+    if date_col not in df or df.empty:
+        return None
+    dates = df[date_col]
+    if not pd.api.types.is_datetime64_any_dtype(dates):
+        return None
+    return dates.max()
+
+
+class FeatureState:
+    """
+    Adstock carryover at the end of the observed data.
+
+    Stores the raw (pre-saturation) adstock of the last row per channel,
+    or per series for a panel, so features for appended weeks are
+    computed in O(new rows) without rescanning history. Produced by
+    ``MediaFeatureBuilder.transform`` as ``state_`` and saved next to
+    the trained model.
+    """
+
+    def __init__(
+        self,
+        channel_params: dict,
+        carryover=None,
+        group_by=None,
+        last_date=None,
+        n_rows: int = 0,
+        time_col: str = None
+    ):
+        """
+        Parameters
+        ----------
+        channel_params : dict
+            Channel adstock & saturation parameters
+        carryover : np.ndarray or dict, optional
+            (channels,) raw adstock for a single series, or
+            {series key: (channels,) array} for a panel. None = no history.
+        group_by : str or list, optional
+            Series columns of a panel
+        last_date : pd.Timestamp, optional
+            Date of the last observed row (tracked when the ``date``
+            column is datetime)
+        n_rows : int
+            Number of rows observed so far
+        time_col : str, optional
+            Default column ordering rows within each series of a panel
+        """
+        self.channel_params = channel_params
+        self.channels = list(channel_params)
+        self.carryover = carryover
+        self.group_by = group_by
+        self.last_date = last_date
+        self.n_rows = n_rows
+        self.time_col = time_col
+
+    @classmethod
+    def from_frame(
+        cls,
+        df: pd.DataFrame,
+        channel_params: dict,
+        group_by=None,
+        time_col: str = None,
+        store: FeatureStore = None
+    ):
+        """
+        State at the end of ``df`` (one pass over the data, or a store lookup)
+        """
+        return cls(channel_params, group_by=group_by).advance(df, time_col, store)
+
+    def extend(
+        self,
+        df: pd.DataFrame,
+        time_col: str = None,
+        inplace: bool = False
+    ) -> pd.DataFrame:
+        """
+        Features for rows appended after the observed data; advances the
+        state to the end of ``df``
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+            New rows with raw spend columns, in chronological order
+            per series (or ordered by ``time_col``)
+        time_col : str, optional
+            Column ordering rows within each series of a panel
+            (default: the state's ``time_col``)
+        inplace : bool
+            Add the feature columns to ``df`` instead of a copy
+        """
+        if not inplace:
+            df = df.copy()
+
+        saturated = self._step(df, time_col)
+        for i, channel in enumerate(self.channels):
+            df[f"{channel}_adstock"] = saturated[:, i]
+
+        return df
+
+    def advance(self, df: pd.DataFrame, time_col: str = None, store: FeatureStore = None):
+        """
+        Move the state to the end of ``df`` without returning features
+        """
+        self._step(df, time_col, store)
+        return self
+
+    def features(self, spend: np.ndarray) -> np.ndarray:
+        """
+        Saturated features for a future (time x channels) spend schedule,
+        or a (plans x time x channels) stack of schedules, continuing from
+        the carryover of a single series. Does not change the state.
+        """
+        if self.group_by is not None:
+            raise ValueError("features() requires a single-series state")
+
+        decays = np.array([p.get("decay", 0.5) for p in self.channel_params.values()])
+        gammas = np.array([p.get("gamma", 0.5) for p in self.channel_params.values()])
+
+        spend = np.asarray(spend, dtype=float)
+        adstocked = adstock_geometric_matrix(
+            spend, decays, axis=spend.ndim - 2, initial=self.carryover
+        )
+        return hill_saturation(adstocked, alpha=1, gamma=gammas, out=adstocked)
+
+    def _step(self, df, time_col, store=None):
+        if time_col is None:
+            # States saved before time_col was recorded lack the attribute
+            time_col = getattr(self, "time_col", None)
+
+        if df.empty:
+            return np.empty((0, len(self.channels)))
 
-        for channel, params in self.channel_params.items():
-            decay = params.get("decay", 0.5)
-            gamma = params.get("gamma", 0.5)
+        saturated, self.carryover = MediaFeatureBuilder(self.channel_params, store)._apply(
+            df, self.group_by, time_col, self.carryover
+        )
 
-            adstocked = adstock_geometric(df[channel].values, decay=decay)
-            df[f"{channel}_adstock"] = hill_saturation(adstocked, alpha=1, gamma=gamma)
+        last_date = _last_date(df)
+        if last_date is not None:
+            self.last_date = last_date if self.last_date is None else max(self.last_date, last_date)
+        self.n_rows += len(df)
 
-        return df
\ No newline at end of file
+        return saturated
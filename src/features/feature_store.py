@@ -0,0 +1,203 @@
+# src/features/feature_store.py
+import hashlib
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.features.adstock import adstock_geometric_matrix
+from src.features.saturation import hill_saturation
+
+
+def column_fingerprint(values: np.ndarray) -> str:
+    """
+    Content hash of a 1-D spend column
+    """
+    values = np.ascontiguousarray(values, dtype=float)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str(values.shape).encode())
+    digest.update(memoryview(values).cast("B"))
+    return digest.hexdigest()
+
+
+def frame_fingerprint(df: pd.DataFrame) -> str:
+    """
+    Content hash of a DataFrame's columns and values (index ignored)
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr(list(df.columns)).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+class FeatureStore:
+    """
+    Memoized adstock / saturation columns.
+
+    Entries are keyed by (spend fingerprint, channel, decay, gamma); raw
+    (unsaturated) adstock is stored with gamma = None. The in-memory cache
+    is an LRU bounded by ``max_mb``; with ``spill_dir`` set, evicted
+    columns are written to disk as .npy files and reloaded (memory-mapped)
+    on the next request instead of being recomputed.
+
+    Cached arrays are read-only. Only full single-series columns starting
+    from zero carryover are cached.
+    """
+
+    def __init__(self, max_mb: float = 256, spill_dir: str = None):
+        """
+        Parameters
+        ----------
+        max_mb : float
+            Memory budget of cached columns
+        spill_dir : str, optional
+            Directory for evicted columns (default: evicted columns are dropped)
+        """
+        self.max_bytes = int(max_mb * 2 ** 20)
+        self.spill_dir = Path(spill_dir) if spill_dir is not None else None
+        if self.spill_dir is not None:
+            self.spill_dir.mkdir(parents=True, exist_ok=True)
+
+        self._entries = OrderedDict()
+        self._nbytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def nbytes(self) -> int:
+        return self._nbytes
+
+    # -------------------------
+    # Cache primitives
+    # -------------------------
+    def get(self, key: tuple):
+        """
+        Cached column for ``key`` or None
+        """
+        with self._lock:
+            values = self._entries.get(key)
+            if values is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return values
+
+        path = self._spill_path(key)
+        if path is not None and path.exists():
+            values = np.load(path, mmap_mode="r").view(np.ndarray)
+            self.put(key, values, copy=False)
+            with self._lock:
+                self.hits += 1
+            return values
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: tuple, values: np.ndarray, copy: bool = True):
+        """
+        Store a column, evicting least recently used ones over budget
+        """
+        values = np.array(values, dtype=float, copy=copy)
+        values.flags.writeable = False
+
+        evicted = []
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._nbytes -= previous.nbytes
+
+            self._entries[key] = values
+            self._nbytes += values.nbytes
+
+            while self._nbytes > self.max_bytes and len(self._entries) > 1:
+                old_key, old_values = self._entries.popitem(last=False)
+                self._nbytes -= old_values.nbytes
+                evicted.append((old_key, old_values))
+
+        for old_key, old_values in evicted:
+            path = self._spill_path(old_key)
+            if path is not None and not path.exists():
+                np.save(path, old_values)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._nbytes = 0
+
+    def _spill_path(self, key: tuple):
+        if self.spill_dir is None:
+            return None
+        name = hashlib.blake2b(repr(key).encode(), digest_size=16).hexdigest()
+        return self.spill_dir / f"{name}.npy"
+
+    # -------------------------
+    # Transforms
+    # -------------------------
+    def transform(
+        self,
+        spend: np.ndarray,
+        channels: list,
+        decays: np.ndarray,
+        gammas: np.ndarray = None
+    ):
+        """
+        Raw adstock and saturated features of a (time x channels) spend
+        matrix. Only columns not in the store are computed, in one
+        vectorized pass.
+
+        Returns
+        -------
+        tuple : (adstock, saturated) arrays of shape (time x channels);
+            saturated is None when ``gammas`` is None
+        """
+        spend = np.asarray(spend, dtype=float)
+        decays = np.asarray(decays, dtype=float)
+
+        fingerprints = [column_fingerprint(spend[:, i]) for i in range(len(channels))]
+        adstock_keys = [
+            (fp, channel, float(decay), None)
+            for fp, channel, decay in zip(fingerprints, channels, decays)
+        ]
+
+        adstocked = np.empty_like(spend)
+        missing = []
+        for i, key in enumerate(adstock_keys):
+            cached = self.get(key)
+            if cached is None:
+                missing.append(i)
+            else:
+                adstocked[:, i] = cached
+
+        if missing:
+            adstocked[:, missing] = adstock_geometric_matrix(spend[:, missing], decays[missing])
+            for i in missing:
+                self.put(adstock_keys[i], adstocked[:, i])
+
+        if gammas is None:
+            return adstocked, None
+
+        gammas = np.asarray(gammas, dtype=float)
+        saturated_keys = [key[:3] + (float(gamma),) for key, gamma in zip(adstock_keys, gammas)]
+
+        saturated = np.empty_like(spend)
+        missing = []
+        for i, key in enumerate(saturated_keys):
+            cached = self.get(key)
+            if cached is None:
+                missing.append(i)
+            else:
+                saturated[:, i] = cached
+
+        if missing:
+            saturated[:, missing] = hill_saturation(adstocked[:, missing], gamma=gammas[missing])
+            for i in missing:
+                self.put(saturated_keys[i], saturated[:, i])
+
+        return adstocked, saturated
@@ -2,7 +2,12 @@
 import numpy as np
 
 
-def hill_saturation(series: np.ndarray, alpha: float = 1, gamma: float = 0.5) -> np.ndarray:
+def hill_saturation(
+    series: np.ndarray,
+    alpha: float = 1,
+    gamma: float = 0.5,
+    out: np.ndarray = None
+) -> np.ndarray:
     """
     Applies Hill saturation to a time series (diminishing returns).
 
@@ -14,10 +19,43 @@ def hill_saturation(series: np.ndarray, alpha: float = 1, gamma: float = 0.5) ->
         Maximum effect
     gamma : float
         Half-saturation constant
+    out : np.ndarray, optional
+        Float buffer to write the result into (may be ``series`` itself)
 
     Returns
     -------
     np.ndarray
         Saturated series
     """
-    return alpha * (series ** gamma) / ((series ** gamma) + (1 ** gamma))
\ No newline at end of file
+    if out is None:
+        return alpha * (series ** gamma) / ((series ** gamma) + (1 ** gamma))
+
+    np.power(series, gamma, out=out)
+    np.divide(out, out + 1, out=out)
+    if alpha != 1:
+        out *= alpha
+    return out
+
+
+def hill_saturation_derivative(series: np.ndarray, alpha: float = 1, gamma: float = 0.5) -> np.ndarray:
+    """
+    Derivative of ``hill_saturation`` with respect to its input.
+
+    Parameters
+    ----------
+    series : np.ndarray
+        Input series (usually adstocked); zeros are nudged to the smallest
+        positive float so that gamma < 1 yields a large finite slope
+    alpha : float
+        Maximum effect
+    gamma : float
+        Half-saturation constant
+
+    Returns
+    -------
+    np.ndarray
+        d saturation / d series, element-wise
+    """
+    series = np.maximum(series, np.finfo(float).tiny)
+    powered = series ** gamma
+    return alpha * gamma * powered / (series * (powered + 1) ** 2)
@@ -1,7 +1,43 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
 import numpy as np
 import pandas as pd
 from pathlib import Path
 
+from src.features.adstock import adstock_geometric_matrix
+from src.features.saturation import hill_saturation
+
+
+# Hidden truth of the panel generator, in the form the MMM estimates:
+# sales = base * seasonality + sum(coef * hill(adstock(spend))) + controls
+PANEL_TRUTH = {
+    "channel_params": {
+        "tv_spend": {"decay": 0.6, "gamma": 0.5},
+        "digital_spend": {"decay": 0.4, "gamma": 0.6},
+        "search_spend": {"decay": 0.3, "gamma": 0.5},
+        "social_spend": {"decay": 0.5, "gamma": 0.4},
+    },
+    "spend_shape": {
+        "tv_spend": [5, 20],
+        "digital_spend": [4, 15],
+        "search_spend": [6, 10],
+        "social_spend": [7, 8],
+    },
+    "coefficients": {
+        "tv_spend_adstock": 6000.0,
+        "digital_spend_adstock": 4500.0,
+        "search_spend_adstock": 7500.0,
+        "social_spend_adstock": 9000.0,
+        "promo_flag": 2000.0,
+        "holiday_flag": 1500.0,
+        "price_index": -4000.0,
+    },
+    "base_sales": 30000.0,
+    "noise_sd": 1500.0,
+}
+
 
 def generate_marketing_data(
     start_date="2021-01-03",
@@ -64,6 +100,196 @@ def generate_marketing_data(
     return df
 
 
+def generate_panel_shard(
+    rng: np.random.Generator,
+    geos: list,
+    n_products: int,
+    n_weeks: int,
+    start_date="2021-01-03"
+) -> pd.DataFrame:
+    """
+    Generate a (geo x product x week) panel block from ``PANEL_TRUTH``
+
+    Parameters
+    ----------
+    rng : np.random.Generator
+        Random stream of this shard
+    geos : list
+        Geo ids in the shard
+    n_products : int
+        Products per geo
+    n_weeks : int
+        Weeks per series
+
+    Returns
+    -------
+    pd.DataFrame
+        Rows ordered by geo, product, date
+    """
+    channel_params = PANEL_TRUTH["channel_params"]
+    coef = PANEL_TRUTH["coefficients"]
+    channels = list(channel_params)
+    n_series = len(geos) * n_products
+
+    dates = pd.date_range(start=start_date, periods=n_weeks, freq="W")
+    weekofyear = dates.isocalendar().week.to_numpy(dtype=int)
+    seasonal_effect = 1 + 0.15 * np.sin(2 * np.pi * weekofyear / 52)
+
+    # Series-level scale of demand and of media budgets
+    base = PANEL_TRUTH["base_sales"] * rng.lognormal(0.0, 0.3, (n_series, 1))
+    budget = rng.lognormal(0.0, 0.5, (n_series, 1, 1))
+
+    shape = np.array([PANEL_TRUTH["spend_shape"][c] for c in channels], dtype=float)
+    spend = rng.gamma(shape[:, 0], shape[:, 1], (n_series, n_weeks, len(channels))) * budget
+
+    decays = np.array([p["decay"] for p in channel_params.values()])
+    gammas = np.array([p["gamma"] for p in channel_params.values()])
+    media = hill_saturation(
+        adstock_geometric_matrix(spend, decays, axis=1), gamma=gammas
+    )
+    channel_coef = np.array([coef[f"{c}_adstock"] for c in channels])
+
+    promo_flag = rng.binomial(1, 0.2, (n_series, n_weeks))
+    holiday_flag = np.broadcast_to(rng.binomial(1, 0.1, n_weeks), (n_series, n_weeks))
+    price_index = rng.normal(1.0, 0.05, (n_series, n_weeks))
+
+    sales = (
+        base * seasonal_effect
+        + media @ channel_coef
+        + coef["promo_flag"] * promo_flag
+        + coef["holiday_flag"] * holiday_flag
+        + coef["price_index"] * (price_index - 1)
+        + rng.normal(0, PANEL_TRUTH["noise_sd"], (n_series, n_weeks))
+    )
+
+    df = pd.DataFrame({
+        "geo": np.repeat(np.asarray(geos), n_products * n_weeks),
+        "product": np.tile(np.repeat(np.arange(n_products), n_weeks), len(geos)),
+        "date": np.tile(dates, n_series),
+        "weekofyear": np.tile(weekofyear, n_series),
+        "promo_flag": promo_flag.ravel(),
+        "holiday_flag": holiday_flag.ravel(),
+        "price_index": price_index.ravel(),
+        "sales": sales.ravel(),
+    })
+    for i, channel in enumerate(channels):
+        df.insert(4 + i, channel, spend[:, :, i].ravel())
+
+    return df
+
+
+def _write_shard(path, seed_sequence, geos, n_products, n_weeks, start_date, file_format):
+    """
+    Generate one shard and write it to ``path``; returns the row count
+    """
+    rng = np.random.default_rng(seed_sequence)
+    df = generate_panel_shard(rng, geos, n_products, n_weeks, start_date)
+
+    if file_format == "parquet":
+        df.to_parquet(path, index=False)
+    else:
+        # Day-first dates, as in the raw extracts the pipelines read;
+        # formatting the unique weeks only is much cheaper than date_format
+        codes, weeks = pd.factorize(df["date"])
+        df["date"] = weeks.strftime("%d-%m-%Y").to_numpy()[codes]
+        df.to_csv(path, index=False)
+
+    return len(df)
+
+
+def generate_panel(
+    output_dir: str,
+    n_geos: int = 100,
+    n_products: int = 10,
+    n_weeks: int = 156,
+    start_date="2021-01-03",
+    seed: int = 42,
+    rows_per_shard: int = 1_000_000,
+    file_format: str = "csv",
+    n_jobs: int = -1
+) -> dict:
+    """
+    Generate a benchmark-scale panel as partitioned files
+
+    Geos are split into shards of about ``rows_per_shard`` rows. Each
+    shard draws from its own ``np.random.Generator`` spawned from
+    ``seed``, so the output depends only on ``seed`` and the shard
+    layout, not on the number of workers. Shards are generated in
+    parallel processes and written independently, so memory is bounded
+    by the shard size.
+
+    Parameters
+    ----------
+    output_dir : str
+        Directory for part-*.csv / part-*.parquet files and ground_truth.json
+    n_geos, n_products, n_weeks : int
+        Panel dimensions
+    seed : int
+        Root seed
+    rows_per_shard : int
+        Target rows per output file
+    file_format : str
+        csv | parquet (parquet requires pyarrow)
+    n_jobs : int
+        Worker processes (-1 = all cores, 1 = in-process)
+
+    Returns
+    -------
+    dict
+        Ground truth: generating parameters, coefficients and written files
+    """
+    if file_format not in ("csv", "parquet"):
+        raise ValueError(f"Unsupported file format: {file_format}")
+    if file_format == "parquet":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError as exc:
+            raise ImportError("Writing Parquet files requires pyarrow") from exc
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    geos_per_shard = max(1, rows_per_shard // (n_products * n_weeks))
+    shards = [
+        list(range(start, min(start + geos_per_shard, n_geos)))
+        for start in range(0, n_geos, geos_per_shard)
+    ]
+    seeds = np.random.SeedSequence(seed).spawn(len(shards))
+    paths = [output_dir / f"part-{i:05d}.{file_format}" for i in range(len(shards))]
+
+    tasks = [
+        (path, seed_sequence, geos, n_products, n_weeks, start_date, file_format)
+        for path, seed_sequence, geos in zip(paths, seeds, shards)
+    ]
+
+    if n_jobs == 1:
+        rows = [_write_shard(*task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=None if n_jobs == -1 else n_jobs) as pool:
+            rows = list(pool.map(_write_shard, *zip(*tasks)))
+
+    truth = {
+        **PANEL_TRUTH,
+        "seed": seed,
+        "n_geos": n_geos,
+        "n_products": n_products,
+        "n_weeks": n_weeks,
+        "start_date": str(start_date),
+        "n_rows": int(sum(rows)),
+        "files": [
+            {"file": path.name, "geos": [geos[0], geos[-1]], "rows": int(n)}
+            for path, geos, n in zip(paths, shards, rows)
+        ],
+    }
+
+    tmp_path = output_dir / f".ground_truth.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(truth, f, indent=2)
+    os.replace(tmp_path, output_dir / "ground_truth.json")
+
+    return truth
+
+
 def save_data(df: pd.DataFrame, path: str):
     Path(path).parent.mkdir(parents=True, exist_ok=True)
     df.to_csv(path, index=False)
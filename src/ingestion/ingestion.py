@@ -1,6 +1,15 @@
+import hashlib
+import json
+import os
+import shutil
+import numpy as np
 import pandas as pd
-from typing import Optional
+from pathlib import Path
+from typing import Iterator, Optional
 
+from src.models.registry import file_sha256
+from src.utils.dates import parse_dates
+from src.utils.instrumentation import instrumented
 from src.utils.logger import logger
 
 
@@ -12,64 +21,355 @@ class DataIngestion:
     - Load data from disk
     - Perform basic validation
     - Keep pipeline code clean
+    - Optionally cache a typed columnar copy of the input
+
+    With ``cache_dir`` set, the first load parses the file and stores
+    every column as a ``.npy`` array (dates already parsed). Later loads
+    of the same content memory-map those arrays instead of re-parsing.
+    Entries are content-addressed: the file hash is recomputed only when
+    the file's size or mtime changed, so re-copying identical data still
+    hits the cache.
     """
 
     def __init__(
         self,
         file_path: str,
-        file_type: Optional[str] = None
+        file_type: Optional[str] = None,
+        cache_dir: Optional[str] = None,
+        parse_dates: Optional[list] = None
     ):
         """
         Parameters
         ----------
         file_path : str
-            Path to input data file
+            Path to input data file, or (for ``iter_chunks``) a directory
+            of part files such as the output of ``generate_panel``
         file_type : str, optional
             Explicit file type: csv | parquet | excel
             If None, inferred from file extension
+        cache_dir : str, optional
+            Directory of the columnar cache (default: no caching)
+        parse_dates : list, optional
+            Columns parsed as dates on load (ISO or day-first)
         """
         self.file_path = file_path
         self.file_type = file_type
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self.parse_dates = list(parse_dates or [])
         self.logger = logger(self.__class__.__name__)
 
-    def load(self) -> pd.DataFrame:
-        """Load data from disk"""
+    @instrumented("ingestion.load", rows="result")
+    def load(
+        self,
+        columns: Optional[list] = None,
+        dtype: Optional[dict] = None
+    ) -> pd.DataFrame:
+        """
+        Load data from disk
+
+        Parameters
+        ----------
+        columns : list, optional
+            Columns to read (default: all)
+        dtype : dict, optional
+            Explicit column dtypes, e.g. {"tv_spend": "float32"}
+        """
 
         self.logger.info(f"Loading data from {self.file_path}")
 
+        if Path(self.file_path).is_dir():
+            raise ValueError(
+                f"{self.file_path} is a directory, stream it with iter_chunks()"
+            )
+
         if self.file_type is None:
             self.file_type = self._infer_file_type()
 
+        if self.cache_dir is None:
+            df = self._read(columns, dtype)
+        else:
+            df = self._load_cached()
+            if columns is not None:
+                df = df[list(columns)]
+            if dtype:
+                df = df.astype(dtype)
+
+        self._basic_validation(df)
+
+        self.logger.info(
+            f"Data loaded successfully | Shape: {df.shape}"
+        )
+
+        return df
+
+    def _read(self, columns=None, dtype=None) -> pd.DataFrame:
+        """Parse the source file"""
+
         if self.file_type == "csv":
-            df = pd.read_csv(self.file_path)
+            df = pd.read_csv(self.file_path, usecols=columns, dtype=dtype)
 
         elif self.file_type == "parquet":
-            df = pd.read_parquet(self.file_path)
+            df = pd.read_parquet(self.file_path, columns=columns)
+            if dtype:
+                df = df.astype(dtype)
 
         elif self.file_type in ["xls", "xlsx", "excel"]:
-            df = pd.read_excel(self.file_path)
+            df = pd.read_excel(self.file_path, usecols=columns, dtype=dtype)
 
         else:
             raise ValueError(
                 f"Unsupported file type: {self.file_type}"
             )
 
-        self._basic_validation(df)
+        for col in self.parse_dates:
+            if col in df:
+                df[col] = parse_dates(df[col])
+
+        return df
+
+    # -------------------------
+    # Columnar cache
+    # -------------------------
+    def _load_cached(self) -> pd.DataFrame:
+        """Load through the cache, creating the entry on a miss"""
+
+        source = Path(self.file_path).resolve()
+        stat = source.stat()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        # Reuse the stored hash while size and mtime are unchanged
+        index_path = self.cache_dir / "index.json"
+        index = {}
+        if index_path.exists():
+            with open(index_path) as f:
+                index = json.load(f)
+
+        record = index.get(str(source))
+        if record and (record["size"], record["mtime_ns"]) == (stat.st_size, stat.st_mtime_ns):
+            sha256 = record["sha256"]
+        else:
+            sha256 = file_sha256(source)
+            index[str(source)] = {
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "sha256": sha256,
+            }
+            tmp_path = index_path.with_name(f".index.{os.getpid()}.tmp")
+            with open(tmp_path, "w") as f:
+                json.dump(index, f, indent=2)
+            os.replace(tmp_path, index_path)
+
+        options = json.dumps([self.file_type, sorted(self.parse_dates)]).encode()
+        entry = self.cache_dir / f"{sha256[:16]}-{hashlib.sha256(options).hexdigest()[:8]}"
+
+        if (entry / "meta.json").exists():
+            self.logger.info(f"Cache hit | {entry.name}")
+            return self._read_entry(entry)
+
+        self.logger.info(f"Cache miss | {entry.name}")
+        df = self._read()
+        self._write_entry(df, entry)
+        return df
+
+    @staticmethod
+    def _write_entry(df: pd.DataFrame, entry: Path) -> None:
+        """
+        Store each column as a .npy file. Numeric, boolean and datetime
+        columns keep their numpy dtype; other columns are stored as
+        fixed-width unicode with a separate null mask.
+        """
+        tmp_dir = entry.with_name(f".{entry.name}.{os.getpid()}.tmp")
+        tmp_dir.mkdir(parents=True, exist_ok=True)
+
+        meta = {"n_rows": len(df), "columns": []}
+        for i, (name, series) in enumerate(df.items()):
+            column = {"name": name, "file": f"col_{i}.npy", "dtype": str(series.dtype)}
+
+            if isinstance(series.dtype, np.dtype) and series.dtype.kind in "biufcmM":
+                values = series.to_numpy()
+            else:
+                mask = series.isna().to_numpy()
+                values = series.astype(object).where(~mask, "").to_numpy(dtype=str)
+                if mask.any():
+                    column["mask"] = f"mask_{i}.npy"
+                    np.save(tmp_dir / column["mask"], mask)
+
+            np.save(tmp_dir / column["file"], values)
+            meta["columns"].append(column)
+
+        with open(tmp_dir / "meta.json", "w") as f:
+            json.dump(meta, f, indent=2)
+
+        try:
+            os.replace(tmp_dir, entry)
+        except OSError:
+            # Another process created the entry first
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    @staticmethod
+    def _read_entry(entry: Path) -> pd.DataFrame:
+        """
+        Open a cache entry. Typed columns are copy-on-write memory maps,
+        so only the pages that are touched are read.
+        """
+        with open(entry / "meta.json") as f:
+            meta = json.load(f)
+
+        data = {}
+        for column in meta["columns"]:
+            values = np.load(entry / column["file"], mmap_mode="c").view(np.ndarray)
+
+            if values.dtype.kind == "U":
+                values = pd.Series(values.astype(object))
+                if "mask" in column:
+                    values[np.load(entry / column["mask"])] = None
+                values = values.astype(column["dtype"])
+
+            data[column["name"]] = values
+
+        return pd.DataFrame(data, copy=False)
+
+    def iter_chunks(
+        self,
+        chunksize: int = 100_000,
+        columns: Optional[list] = None,
+        dtype: Optional[dict] = None
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Stream the file in chunks of at most ``chunksize`` rows.
+
+        Peak memory is bounded by the chunk size rather than the file
+        size. CSV files are read with the pandas chunked reader and
+        Parquet files batch by batch across row groups (requires
+        pyarrow). If ``file_path`` is a directory, its part files of the
+        given (or inferred) type are streamed one after another in name
+        order. Validation runs incrementally: the empty-file and all-NULL
+        column checks are evaluated once the stream is exhausted.
+
+        Parameters
+        ----------
+        chunksize : int
+            Maximum rows per chunk
+        columns : list, optional
+            Columns to read (default: all)
+        dtype : dict, optional
+            Explicit column dtypes, e.g. {"tv_spend": "float32"}
+
+        Yields
+        ------
+        pd.DataFrame
+        """
 
         self.logger.info(
-            f"Data loaded successfully | Shape: {df.shape}"
+            f"Streaming data from {self.file_path} | chunksize: {chunksize}"
         )
 
-        return df
+        if self.file_type is None:
+            self.file_type = self._infer_file_type()
+
+        paths = self._source_files()
+
+        if self.file_type == "csv":
+            chunks = (
+                chunk for path in paths
+                for chunk in self._iter_csv(path, chunksize, columns, dtype)
+            )
+
+        elif self.file_type == "parquet":
+            chunks = (
+                chunk for path in paths
+                for chunk in self._iter_parquet(path, chunksize, columns, dtype)
+            )
+
+        elif self.file_type in ["xls", "xlsx", "excel"]:
+            raise ValueError(
+                "Streaming is not supported for Excel files, use load()"
+            )
+
+        else:
+            raise ValueError(
+                f"Unsupported file type: {self.file_type}"
+            )
+
+        n_rows, n_chunks, non_null = 0, 0, None
+        for chunk in chunks:
+            for col in self.parse_dates:
+                if col in chunk:
+                    chunk[col] = parse_dates(chunk[col])
+
+            counts = chunk.notna().sum()
+            non_null = counts if non_null is None else non_null + counts
+            n_rows += len(chunk)
+            n_chunks += 1
+            yield chunk
+
+        if n_rows == 0:
+            raise ValueError("Loaded DataFrame is empty")
+
+        if (non_null == 0).any():
+            self.logger.warning(
+                "Some columns contain only NULL values"
+            )
+
+        self.logger.info(
+            f"Data streamed successfully | Rows: {n_rows} | Chunks: {n_chunks}"
+        )
+
+    def _source_files(self) -> list:
+        """The file itself, or the part files of a directory"""
+
+        path = Path(self.file_path)
+        if not path.is_dir():
+            return [path]
+
+        suffixes = {
+            "csv": (".csv",),
+            "parquet": (".parquet",),
+        }.get(self.file_type, (".xls", ".xlsx"))
+        files = sorted(
+            p for p in path.iterdir()
+            if p.suffix in suffixes and not p.name.startswith(".")
+        )
+        if not files:
+            raise ValueError(f"No {self.file_type} files in {self.file_path}")
+        return files
+
+    def _iter_csv(self, path, chunksize, columns, dtype):
+        with pd.read_csv(
+            path, chunksize=chunksize, usecols=columns, dtype=dtype
+        ) as reader:
+            yield from reader
+
+    def _iter_parquet(self, path, chunksize, columns, dtype):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as exc:
+            raise ImportError(
+                "Streaming Parquet files requires pyarrow"
+            ) from exc
+
+        parquet_file = pq.ParquetFile(path)
+        for batch in parquet_file.iter_batches(batch_size=chunksize, columns=columns):
+            chunk = batch.to_pandas()
+            yield chunk.astype(dtype) if dtype else chunk
 
     def _infer_file_type(self) -> str:
         """Infer file type from extension"""
 
-        if self.file_path.endswith(".csv"):
+        path = Path(self.file_path)
+        if path.is_dir():
+            # Type of the first recognised part file
+            for part in sorted(path.iterdir()):
+                if part.suffix in (".csv", ".parquet", ".xlsx", ".xls"):
+                    path = part
+                    break
+
+        path = str(path)
+        if path.endswith(".csv"):
             return "csv"
-        elif self.file_path.endswith(".parquet"):
+        elif path.endswith(".parquet"):
             return "parquet"
-        elif self.file_path.endswith(".xlsx") or self.file_path.endswith(".xls"):
+        elif path.endswith(".xlsx") or path.endswith(".xls"):
             return "excel"
         else:
             raise ValueError(
@@ -1,8 +1,14 @@
+import hashlib
+import json
+
 import pandas as pd
 import numpy as np
 from sklearn.linear_model import LinearRegression
-from src.features.adstock import adstock_geometric
-from src.features.saturation import hill_saturation
+from src.features.feature_builder import FeatureState
+from src.features.feature_store import FeatureStore, frame_fingerprint
+from src.models.linear import linear_coefficients
+from src.utils.dates import parse_dates
+from src.utils.instrumentation import instrumented
 
 
 class DemandForecaster:
@@ -10,7 +16,14 @@ class DemandForecaster:
     Baseline demand forecasting with MMM integration
     """
 
-    def __init__(self, baseline_features: list, mmm_model=None, channel_params: dict = None, features_mmm: list = None):
+    def __init__(
+        self,
+        baseline_features: list,
+        mmm_model=None,
+        channel_params: dict = None,
+        features_mmm: list = None,
+        feature_store: FeatureStore = None
+    ):
         """
         Parameters
         ----------
@@ -22,12 +35,51 @@ class DemandForecaster:
             Adstock + saturation parameters per channel
         features_mmm : list
             Features for MMM model (adstocked channels + others)
+        feature_store : FeatureStore, optional
+            Reuses historical adstock when no feature state is given
         """
         self.baseline_features = baseline_features
         self.baseline_model = LinearRegression()
         self.mmm_model = mmm_model
         self.channel_params = channel_params
         self.features_mmm = features_mmm
+        self.feature_store = feature_store
+
+        self.feature_state = None
+        self.data_fingerprint = None
+
+    @instrumented("forecasting.fit", rows="df")
+    def fit(self, df: pd.DataFrame, target_col: str = "sales"):
+        """
+        Fit the baseline model and capture the adstock carryover at the
+        end of ``df``, so the forecaster can be saved and serve forecasts
+        without the history
+        """
+        self.fit_baseline(df, target_col)
+        self.feature_state = FeatureState.from_frame(
+            df, self.channel_params, store=self.feature_store
+        )
+        self.data_fingerprint = self.fingerprint(df, target_col)
+        return self
+
+    def fingerprint(self, df: pd.DataFrame, target_col: str = "sales") -> str:
+        """
+        Hash of the history columns the forecaster is fitted on and of its
+        configuration (features and channel parameters)
+
+        Hashes every row of ``df``, so it costs a pass over the history.
+        """
+        columns = ["date"] + self.baseline_features + [target_col] + list(self.channel_params)
+        columns = [c for c in dict.fromkeys(columns) if c in df]
+
+        config = json.dumps(
+            [self.baseline_features, self.features_mmm, self.channel_params, target_col],
+            sort_keys=True,
+            default=str
+        )
+        digest = hashlib.blake2b(config.encode(), digest_size=16)
+        digest.update(frame_fingerprint(df[columns]).encode())
+        return digest.hexdigest()
 
     def fit_baseline(self, df: pd.DataFrame, target_col: str = "sales"):
         """
@@ -46,42 +98,157 @@ class DemandForecaster:
             raise ValueError("MMM model not provided for uplift calculation.")
         return self.mmm_model.predict(df[self.features_mmm])
 
-    def prepare_future_data(self, df: pd.DataFrame, future_weeks: int, optimized_spend: dict):
+    def prepare_future_data(
+        self,
+        df: pd.DataFrame,
+        future_weeks: int,
+        optimized_spend: dict,
+        feature_state: FeatureState = None
+    ):
         """
         Generate future dataframe with dates, baseline features, and optimized spend
+
+        ``optimized_spend`` values may be a constant weekly spend or a
+        week-by-week schedule of length ``future_weeks`` (e.g. a column of
+        ``FlightingOptimizer.optimize``).
+
+        With a ``feature_state`` (saved at training time, or the one captured
+        by ``fit``), adstock continues from its carryover and history is not
+        rescanned; ``df`` may then be None. Otherwise the state is computed
+        from ``df``.
         """
-        df["date"] = pd.to_datetime(df["date"], dayfirst=True)
+        feature_state = self._resolve_state(df, feature_state)
+        future_df = self.future_calendar(feature_state.last_date, future_weeks)
+
+        # Add optimized spend
+        for channel, value in optimized_spend.items():
+            future_df[channel] = value
+
+        # Apply adstock + saturation for future weeks, continuing from
+        # the historical carryover
+        channels = list(self.channel_params)
+        saturated = feature_state.features(future_df[channels].to_numpy(dtype=float))
+
+        for i, channel in enumerate(channels):
+            future_df[f"{channel}_adstock"] = saturated[:, i]
 
-        last_date = df["date"].max()
-        future_df = pd.date_range(
+        return future_df
+
+    @instrumented("forecasting.forecast_plans", rows="spend_plans")
+    def forecast_plans(
+        self,
+        spend_plans: np.ndarray,
+        feature_state: FeatureState = None
+    ) -> np.ndarray:
+        """
+        Forecast many future spend plans in one vectorized run
+
+        The historical carryover and the baseline forecast are shared by
+        all plans; each plan only adds its media contribution. For a
+        linear MMM the contribution is a single tensor contraction, other
+        models are evaluated with one stacked ``predict`` call.
+
+        Parameters
+        ----------
+        spend_plans : np.ndarray
+            (plans x horizon x channels) weekly spend, channels in
+            ``channel_params`` order
+        feature_state : FeatureState, optional
+            Carryover at the end of history (defaults to the fitted state)
+
+        Returns
+        -------
+        np.ndarray
+            (plans x horizon) forecast sales
+        """
+        if self.mmm_model is None:
+            raise ValueError("MMM model not provided for uplift calculation.")
+
+        spend_plans = np.asarray(spend_plans, dtype=float)
+        channels = list(self.channel_params)
+        if spend_plans.ndim != 3 or spend_plans.shape[2] != len(channels):
+            raise ValueError(
+                f"spend_plans must have shape (plans x horizon x {len(channels)})"
+            )
+
+        n_plans, horizon, _ = spend_plans.shape
+        feature_state = self._resolve_state(None, feature_state)
+        calendar = self.future_calendar(feature_state.last_date, horizon)
+
+        baseline = self.predict_baseline(calendar)
+        saturated = feature_state.features(spend_plans)
+
+        media_cols = [f"{c}_adstock" for c in channels]
+        linear = linear_coefficients(self.mmm_model, self.features_mmm)
+
+        if linear is not None:
+            coef, intercept = linear
+            position = {f: i for i, f in enumerate(self.features_mmm)}
+            channel_coef = np.array([
+                coef[position[c]] if c in position else 0.0 for c in media_cols
+            ])
+            # Raw spend columns used as features move with the plan too
+            raw_coef = np.array([
+                coef[position[c]] if c in position else 0.0 for c in channels
+            ])
+            other = [f for f in self.features_mmm if f not in media_cols and f not in channels]
+            shared = calendar[other].to_numpy(dtype=float) @ coef[[position[f] for f in other]]
+            uplift = saturated @ channel_coef + spend_plans @ raw_coef + (shared + intercept)
+        else:
+            stacked = calendar.iloc[np.tile(np.arange(horizon), n_plans)].reset_index(drop=True)
+            stacked[media_cols] = saturated.reshape(n_plans * horizon, -1)
+            stacked[channels] = spend_plans.reshape(n_plans * horizon, -1)
+            uplift = self.compute_marketing_uplift(stacked).reshape(n_plans, horizon)
+
+        return baseline + uplift
+
+    def _resolve_state(self, df, feature_state):
+        """
+        Explicit state, else the fitted one when no history is given,
+        else the state at the end of ``df``
+        """
+        if feature_state is None and df is None:
+            feature_state = self.feature_state
+
+        if feature_state is None:
+            if df is None:
+                raise ValueError("Either historical data or a feature state is required")
+            # Parsed on a shallow copy, the caller's frame is left as is
+            df = df.assign(date=parse_dates(df["date"]))
+            feature_state = FeatureState.from_frame(
+                df, self.channel_params, store=self.feature_store
+            )
+        elif feature_state.channels != list(self.channel_params):
+            raise ValueError("Feature state does not match channel_params")
+
+        return feature_state
+
+    @staticmethod
+    def future_calendar(last_date, future_weeks: int) -> pd.DataFrame:
+        """
+        Future weeks with default (non-media) features
+        """
+        dates = pd.date_range(
             start=last_date + pd.Timedelta(weeks=1),
             periods=future_weeks,
             freq="W"
         )
 
-        future_df = pd.DataFrame({
-            "date": future_df,
-            "weekofyear": future_df.isocalendar().week.astype(int),
+        return pd.DataFrame({
+            "date": dates,
+            "weekofyear": dates.isocalendar().week.astype(int),
             "price_index": 1.0,
             "promo_flag": [0] * future_weeks,
             "holiday_flag": [0] * future_weeks
         })
 
-        # Add optimized spend
-        for channel, value in optimized_spend.items():
-            future_df[channel] = value
-
-        # Apply adstock + saturation for future weeks
-        for channel, params in self.channel_params.items():
-            adstocked = adstock_geometric(
-                np.concatenate([df[channel].values, future_df[channel].values]),
-                decay=params.get("decay", 0.5)
-            )[-future_weeks:]
-
-            future_df[f"{channel}_adstock"] = hill_saturation(adstocked, gamma=params.get("gamma", 0.5))
-
-        return future_df
+    def __getstate__(self):
+        # The feature store is a process-local cache
+        state = self.__dict__.copy()
+        state["feature_store"] = None
+        return state
 
+    @instrumented("forecasting.forecast", rows="df_future")
     def forecast(self, df_future: pd.DataFrame):
         """
         Forecast sales = baseline + marketing uplift
@@ -0,0 +1,142 @@
+# src/models/incremental.py
+import numpy as np
+import pandas as pd
+
+from src.models.ridge_solver import ridge_intercept, ridge_solve
+
+
+class IncrementalRidge:
+    """
+    Ridge regression trained from streamed batches.
+
+    Each ``partial_fit`` folds a batch into float64 sufficient statistics
+    (XᵀX, Xᵀy and column sums) and re-solves in closed form, so memory is
+    O(p²) however many rows have been seen, and new weeks are added
+    without revisiting history. After any sequence of batches the
+    coefficients equal ``sklearn.linear_model.Ridge`` (with intercept) fit
+    on all rows at once.
+
+    Exposes ``coef_``, ``intercept_`` and ``feature_names_in_`` like the
+    sklearn estimators, so it can be used wherever the pipelines expect a
+    linear MMM.
+    """
+
+    def __init__(self, alpha: float = 1.0):
+        """
+        Parameters
+        ----------
+        alpha : float
+            Regularization strength
+        """
+        self.alpha = alpha
+        self.reset()
+
+    def reset(self):
+        """
+        Forget all data seen so far
+        """
+        self.n_samples_seen_ = 0
+        self.feature_names_in_ = None
+        self.n_features_in_ = None
+        self.coef_ = None
+        self.intercept_ = None
+
+        # Sums are taken around the mean of the first batch, which keeps
+        # the final centering free of cancellation for large-valued columns
+        self._x_shift = None
+        self._y_shift = None
+        self._sxx = None
+        self._sxy = None
+        self._sx = None
+        self._sy = 0.0
+
+        return self
+
+    def partial_fit(self, X, y):
+        """
+        Add a batch of rows and update the coefficients
+
+        Parameters
+        ----------
+        X : pd.DataFrame or np.ndarray
+            Features of the batch
+        y : pd.Series or np.ndarray
+            Target of the batch
+        """
+        if isinstance(X, pd.DataFrame):
+            names = np.asarray(X.columns, dtype=object)
+            if self.feature_names_in_ is None and self.n_samples_seen_ == 0:
+                self.feature_names_in_ = names
+            elif self.feature_names_in_ is not None and not np.array_equal(names, self.feature_names_in_):
+                raise ValueError("Feature names differ from the ones seen before")
+
+        X = np.asarray(X, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        if X.ndim != 2 or len(X) != len(y):
+            raise ValueError("X must be 2-D with one row per target value")
+        if len(X) == 0:
+            return self
+
+        if self._sxx is None:
+            p = X.shape[1]
+            self.n_features_in_ = p
+            self._x_shift = X.mean(axis=0)
+            self._y_shift = y.mean()
+            self._sxx = np.zeros((p, p))
+            self._sxy = np.zeros(p)
+            self._sx = np.zeros(p)
+        elif X.shape[1] != self.n_features_in_:
+            raise ValueError(
+                f"Expected {self.n_features_in_} features, got {X.shape[1]}"
+            )
+
+        Xs = X - self._x_shift
+        ys = y - self._y_shift
+        self._sxx += Xs.T @ Xs
+        self._sxy += Xs.T @ ys
+        self._sx += Xs.sum(axis=0)
+        self._sy += ys.sum()
+        self.n_samples_seen_ += len(X)
+
+        self._solve()
+        return self
+
+    def fit(self, X, y):
+        """
+        Fit on a single batch (discarding earlier batches)
+        """
+        return self.reset().partial_fit(X, y)
+
+    def fit_chunks(self, chunks, features: list, target: str):
+        """
+        Fit on a stream of DataFrames, e.g. ``DataIngestion.iter_chunks``
+        passed through ``MediaFeatureBuilder.transform_chunks``
+        """
+        self.reset()
+        for chunk in chunks:
+            self.partial_fit(chunk[features], chunk[target])
+
+        if self.n_samples_seen_ == 0:
+            raise ValueError("No rows to fit on")
+
+        return self
+
+    def predict(self, X):
+        if self.coef_ is None:
+            raise ValueError("Model is not fitted yet")
+
+        if isinstance(X, pd.DataFrame) and self.feature_names_in_ is not None:
+            X = X[list(self.feature_names_in_)]
+
+        return np.asarray(X, dtype=np.float64) @ self.coef_ + self.intercept_
+
+    def _solve(self):
+        n = self.n_samples_seen_
+        dx = self._sx / n
+        dy = self._sy / n
+
+        gram = self._sxx - n * np.outer(dx, dx)
+        xty = self._sxy - n * dx * dy
+
+        self.coef_ = ridge_solve(gram, xty, self.alpha)
+        self.intercept_ = float(ridge_intercept(self.coef_, self._x_shift + dx, self._y_shift + dy))
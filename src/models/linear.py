@@ -0,0 +1,50 @@
+# src/models/linear.py
+import numpy as np
+from sklearn.linear_model import LinearRegression, Ridge
+
+from src.models.baseline_model import BaselineMMM
+from src.models.incremental import IncrementalRidge
+from src.models.mmm_model import RegularizedMMM
+
+
+# Models whose prediction is intercept + coef · features
+LINEAR_ESTIMATORS = (Ridge, LinearRegression, IncrementalRidge)
+LINEAR_WRAPPERS = (RegularizedMMM, BaselineMMM)
+
+
+def linear_coefficients(model, features: list):
+    """
+    Extract coefficients of a linear MMM aligned to ``features``
+
+    Parameters
+    ----------
+    model : trained MMM model
+        sklearn Ridge / LinearRegression, IncrementalRidge or a
+        RegularizedMMM / BaselineMMM
+    features : list
+        Feature order expected by the caller
+
+    Returns
+    -------
+    tuple or None
+        (coef array aligned to features, intercept), or None if the
+        model is not linear in its features
+    """
+    if isinstance(model, LINEAR_WRAPPERS):
+        estimator = model.model
+        names = None if model.X_train is None else list(model.X_train.columns)
+    elif isinstance(model, LINEAR_ESTIMATORS):
+        estimator = model
+        names = getattr(model, "feature_names_in_", None)
+        names = None if names is None else list(names)
+    else:
+        return None
+
+    coef = np.asarray(estimator.coef_, dtype=float)
+    if coef.ndim != 1:
+        return None
+
+    if names is not None:
+        coef = np.array([coef[names.index(f)] for f in features])
+
+    return coef, float(estimator.intercept_)
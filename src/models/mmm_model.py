@@ -4,6 +4,8 @@ import numpy as np
 from sklearn.linear_model import Ridge
 from src.evaluation.metrics import RegressionMetrics
 from sklearn.model_selection import train_test_split
+from src.models.ridge_solver import select_alpha
+from src.models.validation import RollingOriginCV
 
 
 class RegularizedMMM:
@@ -11,7 +13,14 @@ class RegularizedMMM:
     Regularized Marketing Mix Model using Ridge Regression
     """
 
-    def __init__(self, alpha: float = 1.0, test_size: float = 0.2, shuffle: bool = False, random_state=None):
+    def __init__(
+        self,
+        alpha: float = 1.0,
+        test_size: float = 0.2,
+        shuffle: bool = False,
+        random_state=None,
+        alphas: list = None
+    ):
         """
         Parameters
         ----------
@@ -21,12 +30,18 @@ class RegularizedMMM:
             Fraction of data for test
         shuffle : bool
             Whether to shuffle data for train/test split
+        alphas : list, optional
+            Candidate strengths; if set, ``fit`` picks the best one from a
+            single-SVD regularization path, validated on the last
+            ``test_size`` fraction of the training rows
         """
         self.alpha = alpha
         self.model = Ridge(alpha=self.alpha)
         self.test_size = test_size
         self.shuffle = shuffle
         self.random_state = random_state
+        self.alphas = alphas
+        self.alpha_path_ = None
 
         self.X_train = None
         self.X_test = None
@@ -55,6 +70,12 @@ class RegularizedMMM:
         self.y_train = y_train
         self.y_test = y_test
 
+        if self.alphas is not None:
+            self.alpha, self.alpha_path_ = select_alpha(
+                X_train, y_train, self.alphas, val_size=self.test_size
+            )
+            self.model = Ridge(alpha=self.alpha)
+
         self.model.fit(X_train, y_train)
 
         self.coef_df = pd.DataFrame({
@@ -64,6 +85,33 @@ class RegularizedMMM:
 
         return self
 
+    def cross_validate(
+        self,
+        X: pd.DataFrame,
+        y: pd.Series,
+        n_folds: int = 5,
+        horizon: int = None,
+        alphas: list = None,
+        n_jobs: int = -1
+    ) -> pd.DataFrame:
+        """
+        Rolling-origin cross-validation (chronological rows)
+
+        Evaluates ``alphas`` (default: the model's alpha) on ``n_folds``
+        expanding windows and keeps the best one for the next ``fit``.
+        Returns per-fold metrics.
+        """
+        cv = RollingOriginCV(
+            n_folds=n_folds,
+            horizon=horizon,
+            alphas=[self.alpha] if alphas is None else alphas,
+            n_jobs=n_jobs,
+        ).fit(X, y)
+
+        self.alpha = cv.best_alpha_
+        self.model = Ridge(alpha=self.alpha)
+        return cv.results_
+
     def predict(self, X: pd.DataFrame):
         """
         Predict using trained Ridge model
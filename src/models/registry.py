@@ -0,0 +1,200 @@
+# src/models/registry.py
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+import joblib
+
+from src.utils.logger import logger
+
+
+_log = logger("ModelRegistry")
+
+# path -> ((mtime_ns, size, inode), sha256, object), most recently used last
+_CACHE = OrderedDict()
+_CACHE_SIZE = 16
+_LOCK = threading.Lock()
+
+
+def file_sha256(path, chunk_size: int = 1 << 20) -> str:
+    """
+    Content hash of a file
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def save_artifact(obj, path) -> str:
+    """
+    Write an artifact atomically and return its content hash.
+
+    Artifacts are stored uncompressed so that numpy arrays inside them
+    can be memory-mapped on load.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    joblib.dump(obj, tmp_path)
+    os.replace(tmp_path, path)
+
+    with _LOCK:
+        _CACHE.pop(str(path.resolve()), None)
+
+    return file_sha256(path)
+
+
+def load_artifact(path, mmap_mode: str = "r"):
+    """
+    Load an artifact through the in-process LRU cache.
+
+    A cached object is reused while the file's mtime, size and inode are
+    unchanged. If they changed but the content hash did not (e.g. the
+    file was re-copied), the cached object is still reused; otherwise the
+    file is reloaded. Arrays are memory-mapped read-only by default, so
+    worker processes loading the same file share its pages.
+    """
+    key = str(Path(path).resolve())
+    stat = os.stat(key)
+    signature = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+    with _LOCK:
+        entry = _CACHE.get(key)
+
+    if entry is not None:
+        cached_signature, sha256, obj = entry
+        if cached_signature == signature:
+            with _LOCK:
+                _CACHE.move_to_end(key)
+            return obj
+
+        if cached_signature[1] == stat.st_size and file_sha256(key) == sha256:
+            with _LOCK:
+                _CACHE[key] = (signature, sha256, obj)
+                _CACHE.move_to_end(key)
+            return obj
+
+    sha256 = file_sha256(key)
+    obj = joblib.load(key, mmap_mode=mmap_mode)
+
+    with _LOCK:
+        _CACHE[key] = (signature, sha256, obj)
+        _CACHE.move_to_end(key)
+        while len(_CACHE) > _CACHE_SIZE:
+            _CACHE.popitem(last=False)
+
+    _log.info(f"Loaded artifact {key} | sha256: {sha256[:12]}")
+
+    return obj
+
+
+def clear_cache():
+    """
+    Drop all cached artifacts
+    """
+    with _LOCK:
+        _CACHE.clear()
+
+
+class ModelRegistry:
+    """
+    Versioned artifact store on the local filesystem.
+
+    Layout:
+        <root>/<name>/v0001.joblib, v0002.joblib, ...
+        <root>/<name>/manifest.json   (version, file, sha256, metadata)
+    """
+
+    def __init__(self, root: str = "artifacts"):
+        self.root = Path(root)
+
+    def _manifest_path(self, name: str) -> Path:
+        return self.root / name / "manifest.json"
+
+    def versions(self, name: str) -> list:
+        """
+        All registered versions of an artifact (oldest first)
+        """
+        path = self._manifest_path(name)
+        if not path.exists():
+            return []
+        with open(path) as f:
+            return json.load(f)["versions"]
+
+    def latest_version(self, name: str) -> int:
+        versions = self.versions(name)
+        if not versions:
+            raise FileNotFoundError(f"No registered versions of {name}")
+        return versions[-1]["version"]
+
+    def path(self, name: str, version: int = None) -> Path:
+        """
+        File of a given (default: latest) version
+        """
+        version = self.latest_version(name) if version is None else version
+        return self.root / name / f"v{version:04d}.joblib"
+
+    def register(self, name: str, obj, metadata: dict = None) -> dict:
+        """
+        Store a new version of an artifact
+
+        Returns
+        -------
+        dict
+            Manifest entry of the new version
+        """
+        versions = self.versions(name)
+        version = versions[-1]["version"] + 1 if versions else 1
+        path = self.root / name / f"v{version:04d}.joblib"
+
+        entry = {
+            "version": version,
+            "file": path.name,
+            "sha256": save_artifact(obj, path),
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "metadata": metadata or {},
+        }
+        versions.append(entry)
+
+        manifest_path = self._manifest_path(name)
+        tmp_path = manifest_path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump({"name": name, "versions": versions}, f, indent=2, default=str)
+        os.replace(tmp_path, manifest_path)
+
+        _log.info(f"Registered {name} v{version} | sha256: {entry['sha256'][:12]}")
+
+        return entry
+
+    def load(self, name: str, version: int = None, mmap_mode: str = "r"):
+        """
+        Load a registered version (default: latest) through the cache
+        """
+        return load_artifact(self.path(name, version), mmap_mode=mmap_mode)
+
+    def publish(self, name: str, target, version: int = None) -> Path:
+        """
+        Expose a registered version at a stable path (e.g. the path
+        pipelines load from). Uses a hard link when possible, so the
+        artifact is written only once.
+        """
+        source = self.path(name, version)
+        target = Path(target)
+        target.parent.mkdir(parents=True, exist_ok=True)
+
+        tmp_path = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+        try:
+            os.link(source, tmp_path)
+        except OSError:
+            shutil.copy2(source, tmp_path)
+        os.replace(tmp_path, target)
+
+        return target
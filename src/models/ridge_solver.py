@@ -0,0 +1,161 @@
+# src/models/ridge_solver.py
+import numpy as np
+import pandas as pd
+
+
+def center(X: np.ndarray, y: np.ndarray):
+    """
+    Center design matrix and target (as sklearn Ridge does with an intercept)
+
+    Returns
+    -------
+    tuple
+        (X_centered, y_centered, x_mean, y_mean)
+    """
+    x_mean = X.mean(axis=0)
+    y_mean = y.mean()
+    return X - x_mean, y - y_mean, x_mean, y_mean
+
+
+def ridge_solve(gram: np.ndarray, xty: np.ndarray, alpha: float) -> np.ndarray:
+    """
+    Closed-form Ridge coefficients from centered sufficient statistics.
+
+    Solves ``(XᵀX + alpha * I) coef = Xᵀy``. Both arguments may carry
+    leading batch dimensions, e.g. gram (k, p, p) and xty (k, p), in which
+    case all k systems are solved in one call.
+
+    Parameters
+    ----------
+    gram : np.ndarray
+        Centered Gram matrix XᵀX, shape (..., p, p)
+    xty : np.ndarray
+        Centered cross-product Xᵀy, shape (..., p)
+    alpha : float
+        Regularization strength
+
+    Returns
+    -------
+    np.ndarray
+        Coefficients, shape (..., p)
+    """
+    p = gram.shape[-1]
+    lhs = gram + alpha * np.eye(p)
+    return np.linalg.solve(lhs, xty[..., None])[..., 0]
+
+
+def ridge_intercept(coef: np.ndarray, x_mean: np.ndarray, y_mean: float) -> np.ndarray:
+    """
+    Intercept matching centered Ridge coefficients
+    """
+    return y_mean - coef @ x_mean
+
+
+def ridge_path(
+    X: np.ndarray,
+    y: np.ndarray,
+    alphas,
+    X_val: np.ndarray = None,
+    y_val: np.ndarray = None
+) -> dict:
+    """
+    Ridge solutions for many alphas from one SVD of the centered design.
+
+    With ``X_c = U diag(s) Vᵀ`` the coefficients are
+    ``V diag(s / (s² + alpha)) Uᵀ y_c``, so after the decomposition each
+    alpha costs O(p²). Effective degrees of freedom ``sum s² / (s² + alpha)``,
+    the training residual sum of squares and generalized cross-validation
+    (GCV) scores come from the same factors.
+
+    Parameters
+    ----------
+    X, y : np.ndarray
+        Training design matrix (n x p) and target (intercept is fitted)
+    alphas : sequence of float
+        Regularization strengths
+    X_val, y_val : np.ndarray, optional
+        Validation rows scored for every alpha
+
+    Returns
+    -------
+    dict
+        alphas (A,), coef (A x p), intercept (A,), df (A,), rss (A,),
+        gcv (A,), plus RMSE / MAE / R2 (A,) when validation rows are given
+    """
+    X = np.asarray(X, dtype=float)
+    y = np.asarray(y, dtype=float)
+    alphas = np.atleast_1d(np.asarray(alphas, dtype=float))
+
+    X_c, y_c, x_mean, y_mean = center(X, y)
+    U, s, Vt = np.linalg.svd(X_c, full_matrices=False)
+    uty = U.T @ y_c
+
+    s2 = s ** 2
+    denom = s2[None, :] + alphas[:, None]
+    # Null directions get zero weight (minimum-norm solution at alpha = 0)
+    shrink = np.divide(s[None, :], denom, out=np.zeros_like(denom), where=denom > 0)
+    fit_share = np.divide(s2[None, :], denom, out=np.zeros_like(denom), where=denom > 0)
+
+    coef = (shrink * uty) @ Vt
+    intercept = y_mean - coef @ x_mean
+
+    n = len(y)
+    dof = fit_share.sum(axis=1)
+    rss = (((1 - fit_share) * uty) ** 2).sum(axis=1) + max(y_c @ y_c - uty @ uty, 0.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        gcv = n * rss / (n - dof) ** 2
+
+    path = {
+        "alphas": alphas,
+        "coef": coef,
+        "intercept": intercept,
+        "df": dof,
+        "rss": rss,
+        "gcv": gcv,
+    }
+
+    if X_val is not None and y_val is not None:
+        y_val = np.asarray(y_val, dtype=float)
+        residual = np.asarray(X_val, dtype=float) @ coef.T + intercept - y_val[:, None]
+        sst = ((y_val - y_val.mean()) ** 2).sum()
+        path["RMSE"] = np.sqrt((residual ** 2).mean(axis=0))
+        path["MAE"] = np.abs(residual).mean(axis=0)
+        path["R2"] = 1 - (residual ** 2).sum(axis=0) / sst if sst > 0 else np.full(len(alphas), np.nan)
+
+    return path
+
+
+def select_alpha(X, y, alphas, val_size: float = 0.2):
+    """
+    Pick a Ridge alpha from a regularization path
+
+    The last ``val_size`` fraction of the (chronological) rows is held
+    out and the alpha with the lowest validation RMSE wins; with
+    ``val_size=0`` the lowest GCV score is used instead.
+
+    Returns
+    -------
+    tuple
+        (best alpha, path DataFrame with one row per alpha: df, gcv,
+        validation metrics, intercept and one ``coef_<feature>`` column
+        per feature, fitted on the rows before the validation window)
+    """
+    names = list(getattr(X, "columns", [f"x{i}" for i in range(np.shape(X)[1])]))
+    X = np.asarray(X, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n_val = int(np.ceil(val_size * len(y)))
+
+    if n_val > 0:
+        path = ridge_path(X[:-n_val], y[:-n_val], alphas, X[-n_val:], y[-n_val:])
+        criterion = "RMSE"
+    else:
+        path = ridge_path(X, y, alphas)
+        criterion = "gcv"
+
+    columns = ["alphas", "df", "gcv"] + [m for m in ("RMSE", "MAE", "R2") if m in path]
+    path_df = pd.DataFrame({c: path[c] for c in columns}).rename(columns={"alphas": "alpha"})
+    path_df["intercept"] = path["intercept"]
+    path_df[[f"coef_{name}" for name in names]] = path["coef"]
+
+    best = float(path_df["alpha"].iloc[int(np.nanargmin(path_df[criterion].to_numpy()))])
+    return best, path_df
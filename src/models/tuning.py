@@ -0,0 +1,222 @@
+# src/models/tuning.py
+from itertools import product
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+
+from src.features.adstock import adstock_geometric_matrix
+from src.features.feature_builder import MediaFeatureBuilder
+from src.features.saturation import hill_saturation
+from src.models.ridge_solver import ridge_solve
+from src.utils.logger import logger
+
+
+def _score_candidates(
+    gram_ff, fy, cross, tt, ty, f_mean, t_mean, y_mean,
+    f_val, t_val, y_val, alpha
+) -> np.ndarray:
+    """
+    Solve Ridge for a chunk of candidate columns and return validation RMSE.
+
+    The Gram block of the fixed columns (``gram_ff``) is shared; only the
+    row/column of the candidate channel changes between candidates.
+    """
+    k, q = cross.shape
+
+    gram = np.empty((k, q + 1, q + 1))
+    gram[:, :q, :q] = gram_ff
+    gram[:, :q, q] = cross
+    gram[:, q, :q] = cross
+    gram[:, q, q] = tt
+
+    xty = np.empty((k, q + 1))
+    xty[:, :q] = fy
+    xty[:, q] = ty
+
+    coef = ridge_solve(gram, xty, alpha)
+    coef_f, coef_t = coef[:, :q], coef[:, q]
+    intercept = y_mean - coef_f @ f_mean - coef_t * t_mean
+
+    y_pred = f_val @ coef_f.T + t_val * coef_t + intercept
+    return np.sqrt(((y_pred - y_val[:, None]) ** 2).mean(axis=0))
+
+
+class AdstockGridSearch:
+    """
+    Coordinate-wise search over adstock decay / Hill gamma per channel.
+
+    For each channel in turn, every (decay, gamma) candidate is scored on a
+    chronological hold-out while the other channels stay at their current
+    best values. Candidate columns are computed once per channel, the Gram
+    block of the unchanged columns is reused, and each candidate is solved
+    with closed-form Ridge algebra. Candidate chunks run in parallel.
+    """
+
+    def __init__(
+        self,
+        channel_params: dict,
+        features: list,
+        alpha: float = 1.0,
+        n_rounds: int = 2,
+        n_jobs: int = -1,
+        chunk_size: int = 512
+    ):
+        """
+        Parameters
+        ----------
+        channel_params : dict
+            Starting adstock + saturation parameters per channel
+        features : list
+            Model features (including adstocked channels)
+        alpha : float
+            Ridge regularization strength
+        n_rounds : int
+            Number of passes over all channels
+        n_jobs : int
+            Number of parallel workers (joblib convention)
+        chunk_size : int
+            Candidates solved per batched call
+        """
+        self.channel_params = channel_params
+        self.features = features
+        self.alpha = alpha
+        self.n_rounds = n_rounds
+        self.n_jobs = n_jobs
+        self.chunk_size = chunk_size
+
+        self.best_params_ = None
+        self.best_score_ = None
+        self.results_ = None
+
+        self.logger = logger(self.__class__.__name__)
+
+    def fit(self, df: pd.DataFrame, target: str, grid: dict, n_train: int):
+        """
+        Run the search
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+            Raw data (spend columns, other features and target)
+        target : str
+            Target column
+        grid : dict
+            Candidate values per channel, e.g.
+            {"tv_spend": {"decay": [0.1, ..., 0.9], "gamma": [0.3, ..., 1.0]}}
+            Channels missing from the grid keep their starting parameters.
+        n_train : int
+            Number of leading rows used for fitting; the rest are validation
+        """
+        params = {ch: dict(p) for ch, p in self.channel_params.items()}
+        df_mmm = MediaFeatureBuilder(params).transform(df)
+
+        X = df_mmm[self.features].to_numpy(dtype=float)
+        y = df_mmm[target].to_numpy(dtype=float)
+
+        y_train, y_val = y[:n_train], y[n_train:]
+        y_mean = y_train.mean()
+        y_c = y_train - y_mean
+
+        candidates = {}
+        for channel, values in grid.items():
+            column = f"{channel}_adstock"
+            if column not in self.features:
+                self.logger.warning(f"{column} is not a model feature, skipping {channel}")
+                continue
+            candidates[channel] = self._candidate_columns(
+                df[channel].to_numpy(dtype=float),
+                values.get("decay", [params[channel].get("decay", 0.5)]),
+                values.get("gamma", [params[channel].get("gamma", 0.5)])
+            )
+
+        results = []
+        score = None
+
+        with Parallel(n_jobs=self.n_jobs) as parallel:
+            for round_idx in range(self.n_rounds):
+                for channel, (pairs, T) in candidates.items():
+                    j = self.features.index(f"{channel}_adstock")
+                    fixed = [i for i in range(X.shape[1]) if i != j]
+
+                    F_train = X[:n_train, fixed]
+                    f_mean = F_train.mean(axis=0)
+                    F_c = F_train - f_mean
+
+                    # Shared across all candidates of this channel
+                    gram_ff = F_c.T @ F_c
+                    fy = F_c.T @ y_c
+
+                    T_train = T[:n_train]
+                    t_mean = T_train.mean(axis=0)
+                    cross = T_train.T @ F_c
+                    tt = ((T_train - t_mean) ** 2).sum(axis=0)
+                    ty = T_train.T @ y_c
+
+                    chunks = range(0, len(pairs), self.chunk_size)
+                    scores = np.concatenate(parallel(
+                        delayed(_score_candidates)(
+                            gram_ff, fy,
+                            cross[s:s + self.chunk_size],
+                            tt[s:s + self.chunk_size],
+                            ty[s:s + self.chunk_size],
+                            f_mean,
+                            t_mean[s:s + self.chunk_size],
+                            y_mean,
+                            X[n_train:, fixed],
+                            T[n_train:, s:s + self.chunk_size],
+                            y_val,
+                            self.alpha
+                        )
+                        for s in chunks
+                    ))
+
+                    best = int(np.argmin(scores))
+                    decay, gamma = pairs[best]
+                    params[channel] = {**params[channel], "decay": decay, "gamma": gamma}
+                    X[:, j] = T[:, best]
+                    score = scores[best]
+
+                    results.append(pd.DataFrame({
+                        "round": round_idx,
+                        "channel": channel,
+                        "decay": [p[0] for p in pairs],
+                        "gamma": [p[1] for p in pairs],
+                        "RMSE": scores
+                    }))
+
+                    self.logger.info(
+                        f"Round {round_idx} | {channel}: decay={decay}, gamma={gamma}, RMSE={score:.2f}"
+                    )
+
+        self.best_params_ = params
+        self.best_score_ = score
+        self.results_ = (
+            pd.concat(results, ignore_index=True) if results else pd.DataFrame()
+        )
+
+        return self
+
+    @staticmethod
+    def _candidate_columns(spend: np.ndarray, decays: list, gammas: list):
+        """
+        Transformed channel column for every (decay, gamma) pair.
+
+        Adstock is computed once per decay (all decays in one filter call)
+        and saturation is broadcast over gammas.
+
+        Returns
+        -------
+        tuple
+            (list of (decay, gamma) pairs, array of shape (time x candidates))
+        """
+        decays = np.asarray(decays, dtype=float)
+        gammas = np.asarray(gammas, dtype=float)
+
+        adstocked = adstock_geometric_matrix(
+            np.repeat(spend[:, None], len(decays), axis=1), decays
+        )
+        T = hill_saturation(adstocked[:, :, None], alpha=1, gamma=gammas)
+
+        pairs = list(product(decays.tolist(), gammas.tolist()))
+        return pairs, np.ascontiguousarray(T.reshape(len(spend), -1))
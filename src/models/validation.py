@@ -0,0 +1,212 @@
+# src/models/validation.py
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+
+from src.evaluation.metrics import RegressionMetrics
+from src.models.ridge_solver import ridge_intercept, ridge_solve
+from src.utils.logger import logger
+
+
+def rolling_origin_splits(
+    n_rows: int,
+    n_folds: int = 5,
+    horizon: int = None,
+    step: int = None,
+    gap: int = 0,
+    min_train: int = 2
+) -> list:
+    """
+    Expanding-window folds for time series
+
+    The test windows end at the last row and move back by ``step`` rows
+    per fold; each fold trains on every row before its test window
+    (minus ``gap`` rows).
+
+    Parameters
+    ----------
+    n_rows : int
+        Number of (chronologically ordered) rows
+    n_folds : int
+        Number of forecast origins
+    horizon : int, optional
+        Rows per test window (default: n_rows // (n_folds + 1))
+    step : int, optional
+        Rows between consecutive origins (default: horizon)
+    gap : int
+        Rows left out between the training and test windows
+    min_train : int
+        Smallest allowed training window
+
+    Returns
+    -------
+    list
+        (train_end, test_start, test_end) per fold, oldest first
+    """
+    if horizon is None:
+        horizon = n_rows // (n_folds + 1)
+    if step is None:
+        step = horizon
+    if horizon < 1 or step < 1:
+        raise ValueError("horizon and step must be positive")
+
+    splits = []
+    for i in range(n_folds):
+        test_end = n_rows - (n_folds - 1 - i) * step
+        test_start = test_end - horizon
+        train_end = test_start - gap
+        if train_end < min_train:
+            raise ValueError(
+                f"Fold {i} has {train_end} training rows, fewer than {min_train}; "
+                f"reduce n_folds, horizon or step"
+            )
+        splits.append((train_end, test_start, test_end))
+
+    return splits
+
+
+def _score_fold(gram, xty, x_mean, y_mean, X_test, y_test, alpha):
+    """
+    Ridge solve from a fold's centered statistics, scored on its test window
+    """
+    coef = ridge_solve(gram, xty, alpha)
+    intercept = ridge_intercept(coef, x_mean, y_mean)
+    return RegressionMetrics.evaluate(y_test, X_test @ coef + intercept)
+
+
+class RollingOriginCV:
+    """
+    Rolling-origin cross-validation of Ridge MMMs.
+
+    The training window only grows as the origin moves forward, so XᵀX
+    and Xᵀy are accumulated incrementally: each fold adds the rows since
+    the previous origin (O(rows · p²)) and is then solved in closed form
+    (O(p³)) for every alpha, giving the same coefficients as refitting
+    ``sklearn.linear_model.Ridge`` on the fold. Solves and scoring of all
+    (fold, alpha) pairs run in parallel.
+    """
+
+    def __init__(
+        self,
+        n_folds: int = 5,
+        horizon: int = None,
+        step: int = None,
+        gap: int = 0,
+        alphas=(1.0,),
+        n_jobs: int = -1
+    ):
+        """
+        Parameters
+        ----------
+        n_folds : int
+            Number of forecast origins
+        horizon : int, optional
+            Rows per test window (default: n_rows // (n_folds + 1))
+        step : int, optional
+            Rows between consecutive origins (default: horizon)
+        gap : int
+            Rows left out between the training and test windows
+        alphas : sequence of float
+            Ridge regularization strengths to evaluate
+        n_jobs : int
+            Number of parallel workers (joblib convention)
+        """
+        self.n_folds = n_folds
+        self.horizon = horizon
+        self.step = step
+        self.gap = gap
+        self.alphas = [float(a) for a in np.atleast_1d(alphas)]
+        self.n_jobs = n_jobs
+
+        self.splits_ = None
+        self.results_ = None
+        self.summary_ = None
+        self.best_alpha_ = None
+
+        self.logger = logger(self.__class__.__name__)
+
+    def fit(self, X, y):
+        """
+        Score every alpha on every fold
+
+        Parameters
+        ----------
+        X : pd.DataFrame or np.ndarray
+            Features, rows in chronological order
+        y : pd.Series or np.ndarray
+            Target
+        """
+        X = np.asarray(X, dtype=float)
+        y = np.asarray(y, dtype=float)
+        self.splits_ = rolling_origin_splits(
+            len(X), self.n_folds, self.horizon, self.step, self.gap
+        )
+
+        tasks = []
+        for fold, (train_end, test_start, test_end), stats in zip(
+            range(len(self.splits_)), self.splits_, self._fold_statistics(X, y)
+        ):
+            for alpha in self.alphas:
+                tasks.append((fold, alpha, stats, X[test_start:test_end], y[test_start:test_end]))
+
+        scores = Parallel(n_jobs=self.n_jobs)(
+            delayed(_score_fold)(*stats, X_test, y_test, alpha)
+            for _, alpha, stats, X_test, y_test in tasks
+        )
+
+        self.results_ = pd.DataFrame([
+            {
+                "fold": fold,
+                "alpha": alpha,
+                "train_rows": self.splits_[fold][0],
+                "test_start": self.splits_[fold][1],
+                "test_end": self.splits_[fold][2],
+                **{k: float(v) for k, v in metrics.items()},
+            }
+            for (fold, alpha, *_), metrics in zip(tasks, scores)
+        ])
+
+        self.summary_ = self.results_.groupby("alpha")[["RMSE", "MAE", "R2"]].agg(["mean", "std"])
+        self.best_alpha_ = float(self.summary_[("RMSE", "mean")].idxmin())
+
+        self.logger.info(
+            f"Cross-validated {len(self.alphas)} alphas on {len(self.splits_)} folds | "
+            f"Best alpha: {self.best_alpha_} | "
+            f"RMSE: {self.summary_.loc[self.best_alpha_, ('RMSE', 'mean')]:.2f}"
+        )
+
+        return self
+
+    def _fold_statistics(self, X: np.ndarray, y: np.ndarray):
+        """
+        Centered (XᵀX, Xᵀy, x_mean, y_mean) of each fold's training window,
+        accumulated over the rows added since the previous origin.
+
+        Sums are taken around the mean of the first window, which keeps
+        the later centering free of cancellation for large-valued columns.
+        """
+        first_end = self.splits_[0][0]
+        x_shift = X[:first_end].mean(axis=0)
+        y_shift = y[:first_end].mean()
+
+        p = X.shape[1]
+        sxx = np.zeros((p, p))
+        sxy = np.zeros(p)
+        sx = np.zeros(p)
+        sy = 0.0
+        n = 0
+
+        for train_end, _, _ in self.splits_:
+            Xs = X[n:train_end] - x_shift
+            ys = y[n:train_end] - y_shift
+            sxx += Xs.T @ Xs
+            sxy += Xs.T @ ys
+            sx += Xs.sum(axis=0)
+            sy += ys.sum()
+            n = train_end
+
+            dx = sx / n
+            dy = sy / n
+            gram = sxx - n * np.outer(dx, dx)
+            xty = sxy - n * dx * dy
+            yield gram, xty, x_shift + dx, y_shift + dy
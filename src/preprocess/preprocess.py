@@ -2,29 +2,156 @@ import pandas as pd
 import numpy as np
 
 
+FILL_STRATEGIES = ("mean", "median", "zero")
+
+
 class Preprocessor:
     """
     Data preprocessing for MMM
+
+    Use ``fit`` on training data and ``transform`` at inference: fill
+    values are learned once and stored in ``fill_values_`` (saved with the
+    object), so serving data is filled with the training statistics.
+    ``transform`` fills missing values, encodes flags and log-transforms
+    columns in one vectorized pass over the numeric columns it touches.
+
+    The static helpers apply a single step to a frame with statistics
+    of that frame.
     """
 
-    def __init__(self):
-        pass
+    def __init__(
+        self,
+        strategy: str = "mean",
+        flag_columns: list = None,
+        log_columns: list = None,
+        inplace: bool = False
+    ):
+        """
+        Parameters
+        ----------
+        strategy : str
+            Fill value of numeric columns: mean | median | zero
+        flag_columns : list, optional
+            Columns encoded as 0/1 integers (e.g. promo_flag)
+        log_columns : list, optional
+            Columns replaced by log1p
+        inplace : bool
+            Modify the frame passed to ``transform`` instead of returning
+            a new one
+        """
+        if strategy not in FILL_STRATEGIES:
+            raise ValueError(
+                f"Unknown fill strategy {strategy!r}, expected one of {FILL_STRATEGIES}"
+            )
+
+        self.strategy = strategy
+        self.flag_columns = list(flag_columns or [])
+        self.log_columns = list(log_columns or [])
+        self.inplace = inplace
+
+        self.fill_values_ = None
+
+    def fit(self, df: pd.DataFrame):
+        """
+        Learn the fill value of every numeric column
+        """
+        missing = [c for c in self.flag_columns + self.log_columns if c not in df]
+        if missing:
+            raise KeyError(f"Columns not in data: {missing}")
+
+        numeric = df.select_dtypes(include="number")
+        self.fill_values_ = self._statistics(numeric, self.strategy).astype(float)
+
+        return self
+
+    def transform(self, df: pd.DataFrame, inplace: bool = None) -> pd.DataFrame:
+        """
+        Fill, encode and log-transform with the fitted statistics
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+            Data with the columns seen in ``fit``
+        inplace : bool, optional
+            Override the instance's ``inplace`` setting
+
+        Returns
+        -------
+        pd.DataFrame
+            ``df`` itself when in place, otherwise a new frame sharing the
+            untouched columns
+        """
+        if self.fill_values_ is None:
+            raise ValueError("Preprocessor is not fitted yet")
+
+        inplace = self.inplace if inplace is None else inplace
+        out = df if inplace else df.copy(deep=False)
+
+        # Numeric columns that may need work, processed as one block
+        columns = list(dict.fromkeys(
+            [c for c in self.fill_values_.index if c in df]
+            + self.flag_columns + self.log_columns
+        ))
+        if not columns:
+            return out
+
+        block = df[columns].to_numpy(dtype=float, copy=True)
+        fill = self.fill_values_.reindex(columns).to_numpy()
+
+        missing = np.isnan(block)
+        np.copyto(block, np.broadcast_to(fill, block.shape), where=missing & ~np.isnan(fill))
+
+        position = {c: i for i, c in enumerate(columns)}
+        flags = [position[c] for c in self.flag_columns]
+        logs = [position[c] for c in self.log_columns]
+
+        if flags:
+            if np.isnan(block[:, flags]).any():
+                raise ValueError("Flag columns contain missing values")
+            block[:, flags] = np.trunc(block[:, flags])
+        if logs:
+            block[:, logs] = np.log1p(block[:, logs])
+
+        # Columns without missing values that are not encoded or logged
+        # are left untouched (and keep their dtype)
+        changed = missing.any(axis=0)
+        changed[flags] = True
+        changed[logs] = True
+
+        for i in np.flatnonzero(changed):
+            values = block[:, i]
+            out[columns[i]] = values.astype(int) if i in flags and i not in logs else values
+
+        return out
+
+    def fit_transform(self, df: pd.DataFrame, inplace: bool = None) -> pd.DataFrame:
+        return self.fit(df).transform(df, inplace=inplace)
+
+    @staticmethod
+    def _statistics(df: pd.DataFrame, strategy: str) -> pd.Series:
+        if strategy == "zero":
+            return pd.Series(0.0, index=df.columns)
+        if strategy in ("mean", "median"):
+            return getattr(df, strategy)()
+        raise ValueError(
+            f"Unknown fill strategy {strategy!r}, expected one of {FILL_STRATEGIES}"
+        )
 
     @staticmethod
     def fill_missing(df: pd.DataFrame, strategy="mean") -> pd.DataFrame:
         """
         Fill missing values
         """
-        df_filled = df.copy()
-        for col in df.columns:
-            if df[col].isnull().sum() > 0:
-                if strategy == "mean":
-                    df_filled[col].fillna(df[col].mean(), inplace=True)
-                elif strategy == "median":
-                    df_filled[col].fillna(df[col].median(), inplace=True)
-                elif strategy == "zero":
-                    df_filled[col].fillna(0, inplace=True)
-        return df_filled
+        has_missing = df.columns[df.isna().any().to_numpy()]
+        if len(has_missing) == 0:
+            return df.copy()
+
+        if strategy == "zero":
+            values = dict.fromkeys(has_missing, 0)
+        else:
+            values = Preprocessor._statistics(df[has_missing], strategy).to_dict()
+
+        return df.fillna(values)
 
     @staticmethod
     def encode_flags(df: pd.DataFrame, flag_columns: list) -> pd.DataFrame:
@@ -44,4 +171,4 @@ class Preprocessor:
         df_log = df.copy()
         for col in cols:
             df_log[col] = np.log1p(df_log[col])
-        return df_log
\ No newline at end of file
+        return df_log
@@ -0,0 +1,444 @@
+# src/serving/server.py
+import argparse
+import asyncio
+import json
+import time
+from collections import defaultdict, deque
+from http import HTTPStatus
+from pathlib import Path
+
+import numpy as np
+
+from src.features.feature_builder import MediaFeatureBuilder
+from src.ingestion.ingestion import DataIngestion
+from src.models.forecasting import DemandForecaster
+from src.models.registry import load_artifact
+from src.simulation.optimizer import BudgetOptimizer
+from src.simulation.response_curves import ResponseCurveIndex
+from src.simulation.scenarios import ScenarioSimulator
+from src.utils import config_loader as config
+from src.utils import instrumentation
+from src.utils.logger import logger
+
+
+# Endpoints served by InferenceService; other paths are tracked as "unknown"
+ROUTES = ("/health", "/metrics", "/metrics/stages", "/scenario", "/forecast", "/optimize")
+
+
+class LatencyTracker:
+    """
+    Rolling per-endpoint request latencies
+    """
+
+    def __init__(self, window: int = 10000):
+        self.samples = defaultdict(lambda: deque(maxlen=window))
+        self.counts = defaultdict(int)
+
+    def record(self, endpoint: str, seconds: float):
+        self.samples[endpoint].append(seconds * 1000)
+        self.counts[endpoint] += 1
+
+    def summary(self) -> dict:
+        result = {}
+        for endpoint, samples in self.samples.items():
+            values = np.fromiter(samples, dtype=float)
+            p50, p90, p99 = np.percentile(values, [50, 90, 99])
+            result[endpoint] = {
+                "count": self.counts[endpoint],
+                "p50_ms": p50,
+                "p90_ms": p90,
+                "p99_ms": p99,
+                "max_ms": values.max(),
+            }
+        return result
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent requests into one vectorized call.
+
+    Requests queue up while a batch is being evaluated; the next batch
+    takes everything waiting (up to ``max_batch``), after giving
+    stragglers at most ``max_wait_ms`` to arrive.
+    """
+
+    def __init__(self, fn, max_batch: int = 512, max_wait_ms: float = 2.0):
+        """
+        Parameters
+        ----------
+        fn : callable
+            Takes a list of request payloads, returns a list of results
+        max_batch : int
+            Maximum requests per call
+        max_wait_ms : float
+            Maximum time to wait for a batch to fill
+        """
+        self.fn = fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.queue = None
+        self.task = None
+
+    def start(self):
+        self.queue = asyncio.Queue()
+        self.task = asyncio.create_task(self._worker())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+
+    async def submit(self, payload):
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((payload, future))
+        return await future
+
+    async def _worker(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.max_wait
+
+            while len(batch) < self.max_batch:
+                if not self.queue.empty():
+                    batch.append(self.queue.get_nowait())
+                    continue
+
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            payloads = [payload for payload, _ in batch]
+            try:
+                results = await loop.run_in_executor(None, self.fn, payloads)
+            except Exception as exc:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+                continue
+
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    if isinstance(result, Exception):
+                        future.set_exception(result)
+                    else:
+                        future.set_result(result)
+
+
+class InferenceService:
+    """
+    Long-lived MMM inference service.
+
+    Loads the model and builds feature state once at startup, then serves
+    forecasts, scenario simulations and budget optimization over HTTP.
+    Scenario and forecast requests are micro-batched. Scenarios are
+    answered from the response-curve index written by ``TrainPipeline``
+    when it matches the model, and simulated exactly otherwise.
+    """
+
+    def __init__(
+        self,
+        data_path: str,
+        channel_params: dict,
+        features_mmm: list,
+        baseline_features: list,
+        model_path: str = "artifacts/ridge_mmm_model.pkl",
+        curves_path: str = "artifacts/response_curves.npz",
+        cache_dir: str = None,
+        max_batch: int = 512,
+        max_wait_ms: float = 2.0
+    ):
+        self.logger = logger(self.__class__.__name__)
+
+        self.channel_params = channel_params
+        self.channels = list(channel_params)
+        self.features_mmm = features_mmm
+
+        df = DataIngestion(data_path, "csv", cache_dir=cache_dir, parse_dates=["date"]).load()
+        df["weekofyear"] = df["date"].dt.isocalendar().week.astype(int)
+
+        self.history = df
+        self.model = load_artifact(model_path)
+
+        builder = MediaFeatureBuilder(channel_params)
+        df_mmm = builder.transform(df)
+        self.feature_state = builder.state_
+        self.simulator = ScenarioSimulator(
+            model=self.model,
+            df=df_mmm,
+            channel_params=channel_params,
+            features=features_mmm,
+        )
+        self.optimizer = BudgetOptimizer(self.simulator, self.channels)
+        self.curves = self._load_curves(curves_path)
+
+        self.forecaster = DemandForecaster(
+            baseline_features=baseline_features,
+            mmm_model=self.model,
+            channel_params=channel_params,
+            features_mmm=features_mmm,
+        ).fit_baseline(df)
+
+        self.latency = LatencyTracker()
+        self.batchers = {
+            "/scenario": MicroBatcher(self._scenario_batch, max_batch, max_wait_ms),
+            "/forecast": MicroBatcher(self._forecast_batch, max_batch, max_wait_ms),
+        }
+
+        self.logger.info("Inference service initialized")
+
+    def _load_curves(self, path: str):
+        """
+        Response-curve index at ``path`` if it agrees with the simulator
+        within its error bound on a few probe scenarios (it may predate
+        an incremental model update), else None
+        """
+        if path is None or not Path(path).exists():
+            return None
+
+        curves = ResponseCurveIndex.load(path)
+        if curves.channels != self.channels:
+            self.logger.warning(f"{path} does not match the model channels, not used")
+            return None
+
+        eye = np.eye(len(self.channels))
+        probes = np.vstack([0.2 * eye, -0.2 * eye])
+        _, exact = self.simulator.simulate_batch(probes)
+        error = np.abs(curves.query_batch(probes) - exact)
+        tolerance = curves.error_bound_batch(probes) + 1e-9 * max(1.0, np.abs(exact).max())
+        if (error > tolerance).any():
+            self.logger.warning(f"{path} does not match the model, not used")
+            return None
+
+        return curves
+
+    # -------------------------
+    # Batched handlers
+    # -------------------------
+    def _scenario_batch(self, payloads: list) -> list:
+        """
+        One simulate_batch call for all queued scenario requests
+        """
+        changes = np.zeros((len(payloads), len(self.channels)))
+        errors = {}
+        for row, payload in enumerate(payloads):
+            try:
+                for channel, pct_change in payload["changes"].items():
+                    changes[row, self.channels.index(channel)] = float(pct_change)
+            except (KeyError, ValueError, TypeError, AttributeError) as exc:
+                errors[row] = ValueError(f"Invalid scenario: {exc}")
+                changes[row] = 0
+
+        # Interpolate scenarios inside the curve grid, simulate the rest
+        lifts = np.empty(len(payloads))
+        bounds = np.zeros(len(payloads))
+        inside = np.zeros(len(payloads), dtype=bool)
+        if self.curves is not None:
+            scale = 1 + changes
+            grid = self.curves.multipliers
+            inside = ((scale >= grid[0]) & (scale <= grid[-1])).all(axis=1)
+            lifts[inside] = self.curves.query_batch(changes[inside])
+            bounds[inside] = self.curves.error_bound_batch(changes[inside])
+        if not inside.all():
+            _, lifts[~inside] = self.simulator.simulate_batch(changes[~inside])
+
+        total_sales = self.simulator.baseline_sales + lifts
+
+        return [
+            errors.get(row, {
+                "total_sales": float(total_sales[row]),
+                "sales_lift": float(lifts[row]),
+                "error_bound": float(bounds[row]),
+            })
+            for row in range(len(payloads))
+        ]
+
+    def _forecast_batch(self, payloads: list) -> list:
+        """
+        One multi-plan forecast for all queued requests. Plans shorter
+        than the longest horizon are zero-padded at the end, which does
+        not affect their earlier weeks.
+        """
+        defaults = self.history[self.channels].mean().to_numpy(dtype=float)
+        horizons, errors = [], {}
+        for row, payload in enumerate(payloads):
+            try:
+                weeks = int(payload.get("weeks", 12))
+                if weeks < 1:
+                    raise ValueError("weeks must be positive")
+                horizons.append(weeks)
+            except (ValueError, TypeError, AttributeError) as exc:
+                errors[row] = ValueError(f"Invalid forecast request: {exc}")
+                horizons.append(0)
+
+        if not any(horizons):
+            return [errors[row] for row in range(len(payloads))]
+
+        plans = np.zeros((len(payloads), max(horizons), len(self.channels)))
+        for row, payload in enumerate(payloads):
+            if row in errors:
+                continue
+            try:
+                spend = payload.get("spend", {})
+                for i, channel in enumerate(self.channels):
+                    plans[row, :horizons[row], i] = spend.get(channel, defaults[i])
+            except (ValueError, TypeError, AttributeError) as exc:
+                errors[row] = ValueError(f"Invalid forecast request: {exc}")
+
+        forecasts = self.forecaster.forecast_plans(plans, feature_state=self.feature_state)
+        dates = self.forecaster.future_calendar(
+            self.feature_state.last_date, plans.shape[1]
+        )["date"].dt.strftime("%Y-%m-%d").tolist()
+
+        return [
+            errors.get(row, {
+                "date": dates[:horizons[row]],
+                "forecast_sales": forecasts[row, :horizons[row]].tolist(),
+            })
+            for row in range(len(payloads))
+        ]
+
+    def _optimize(self, payload: dict) -> dict:
+        bounds = {k: tuple(v) for k, v in payload.get("bounds", {}).items()}
+        allocation = self.optimizer.allocate(
+            total_budget=payload.get("total_budget"),
+            bounds=bounds,
+        )
+        return {"allocation": allocation.to_dict(orient="records")}
+
+    # -------------------------
+    # HTTP
+    # -------------------------
+    async def handle(self, method: str, path: str, body: bytes):
+        """
+        Route a request; returns (status, payload)
+        """
+        if method == "GET" and path == "/health":
+            return HTTPStatus.OK, {"status": "ok"}
+
+        if method == "GET" and path == "/metrics":
+            return HTTPStatus.OK, self.latency.summary()
+
+        if method == "GET" and path == "/metrics/stages":
+            return HTTPStatus.OK, instrumentation.snapshot()
+
+        if method != "POST":
+            return HTTPStatus.NOT_FOUND, {"error": f"Unknown endpoint {method} {path}"}
+
+        try:
+            payload = json.loads(body or b"{}")
+        except json.JSONDecodeError as exc:
+            return HTTPStatus.BAD_REQUEST, {"error": f"Invalid JSON: {exc}"}
+
+        try:
+            if path in self.batchers:
+                return HTTPStatus.OK, await self.batchers[path].submit(payload)
+
+            if path == "/optimize":
+                loop = asyncio.get_running_loop()
+                return HTTPStatus.OK, await loop.run_in_executor(None, self._optimize, payload)
+        except (ValueError, KeyError, TypeError, AttributeError) as exc:
+            return HTTPStatus.BAD_REQUEST, {"error": str(exc)}
+        except Exception:
+            self.logger.exception(f"Request {method} {path} failed")
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "Internal server error"}
+
+        return HTTPStatus.NOT_FOUND, {"error": f"Unknown endpoint {method} {path}"}
+
+    async def _serve_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    key, _, value = line.decode("latin-1").partition(":")
+                    headers[key.strip().lower()] = value.strip()
+
+                length = int(headers.get("content-length", 0))
+                body = await reader.readexactly(length) if length else b""
+
+                route = path.split("?", 1)[0]
+                start = time.perf_counter()
+                status, payload = await self.handle(method, route, body)
+                self.latency.record(
+                    route if route in ROUTES else "unknown", time.perf_counter() - start
+                )
+
+                data = json.dumps(payload, default=float).encode()
+                keep_alive = headers.get("connection", "").lower() != "close"
+                writer.write(
+                    f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode()
+                    + data
+                )
+                await writer.drain()
+
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionResetError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8080):
+        """
+        Run the HTTP server until cancelled
+        """
+        for batcher in self.batchers.values():
+            batcher.start()
+
+        server = await asyncio.start_server(self._serve_connection, host, port)
+        self.logger.info(f"Serving on http://{host}:{port}")
+
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            for batcher in self.batchers.values():
+                await batcher.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MMM inference service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--data-path", default=str(config.DATA_PATH))
+    parser.add_argument("--model-path", default="artifacts/ridge_mmm_model.pkl")
+    parser.add_argument("--curves-path", default="artifacts/response_curves.npz")
+    parser.add_argument("--cache-dir", default=str(config.CACHE_DIR))
+    parser.add_argument("--max-batch", type=int, default=512)
+    parser.add_argument("--max-wait-ms", type=float, default=2.0)
+    parser.add_argument("--instrument", action="store_true", help="Record per-stage timings")
+    args = parser.parse_args()
+
+    if args.instrument:
+        instrumentation.enable()
+
+    service = InferenceService(
+        data_path=args.data_path,
+        channel_params=config.CHANNEL_PARAMS,
+        features_mmm=config.FEATURES_MMM,
+        baseline_features=config.BASELINE_FEATURES,
+        model_path=args.model_path,
+        curves_path=args.curves_path,
+        cache_dir=args.cache_dir,
+        max_batch=args.max_batch,
+        max_wait_ms=args.max_wait_ms,
+    )
+    asyncio.run(service.serve(args.host, args.port))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+import numpy as np
+import pandas as pd
+
+from src.features.adstock import adstock_geometric_matrix
+from src.features.saturation import hill_saturation, hill_saturation_derivative
+from src.models.linear import linear_coefficients
+
+
+class FlightingOptimizer:
+    """
+    Optimizes a week-by-week (flighting) spend schedule over a forecast horizon
+    """
+
+    def __init__(self, model, df: pd.DataFrame, channel_params: dict, features: list):
+        """
+        Parameters
+        ----------
+        model : trained linear MMM model
+        df : pd.DataFrame
+            Historical data with raw spend columns (used for carryover)
+        channel_params : dict
+            Channel adstock & saturation parameters
+        features : list
+            Model features (including adstocked channels)
+        """
+        linear = linear_coefficients(model, features)
+        if linear is None:
+            raise ValueError("FlightingOptimizer requires a linear MMM")
+        coef, _ = linear
+
+        self.channels = list(channel_params)
+        self.decays = np.array([p.get("decay", 0.5) for p in channel_params.values()])
+        self.gammas = np.array([p.get("gamma", 0.5) for p in channel_params.values()])
+        self.coef = np.array([
+            coef[features.index(f"{c}_adstock")] if f"{c}_adstock" in features else 0.0
+            for c in self.channels
+        ])
+
+        history = df[self.channels].to_numpy(dtype=float)
+        self.carryover = adstock_geometric_matrix(history, self.decays)[-1]
+        self.weekly_spend = history.mean(axis=0)
+
+        self.expected_sales_ = None
+        self.flat_sales_ = None
+        self.n_iter_ = None
+
+    def media_sales(self, schedule: np.ndarray):
+        """
+        Media-driven sales over the horizon and its gradient.
+
+        The forward pass runs the adstock recurrence from the historical
+        carryover. The gradient with respect to every week's spend comes
+        from one backward (adjoint) pass of the same recurrence:
+        ``lambda[t] = g[t] + decay * lambda[t + 1]``.
+
+        Parameters
+        ----------
+        schedule : np.ndarray
+            (horizon x channels) spend
+
+        Returns
+        -------
+        tuple : (total media sales, gradient of shape (horizon x channels))
+        """
+        adstocked = adstock_geometric_matrix(schedule, self.decays, initial=self.carryover)
+        value = (hill_saturation(adstocked, gamma=self.gammas) @ self.coef).sum()
+
+        local = self.coef * hill_saturation_derivative(adstocked, gamma=self.gammas)
+        grad = adstock_geometric_matrix(local[::-1], self.decays)[::-1]
+
+        return value, grad
+
+    def optimize(
+        self,
+        horizon: int,
+        total_budget: float = None,
+        channel_budgets: dict = None,
+        lower=0.0,
+        upper=np.inf,
+        max_iter: int = 500,
+        tol: float = 1e-9
+    ) -> pd.DataFrame:
+        """
+        Find the spend schedule that maximizes media-driven sales
+
+        Parameters
+        ----------
+        horizon : int
+            Number of future weeks
+        total_budget : float, optional
+            Total spend across all weeks and channels
+            (defaults to historical average weekly spend x horizon)
+        channel_budgets : dict, optional
+            Fixed total per channel; when given, budget is only moved
+            across weeks within each channel
+        lower, upper : float or array-like
+            Weekly spend bounds, broadcastable to (horizon x channels)
+        max_iter : int
+            Maximum projected-gradient iterations
+        tol : float
+            Relative improvement below which the search stops
+
+        Returns
+        -------
+        pd.DataFrame
+            (horizon x channels) optimal weekly spend
+        """
+        shape = (horizon, len(self.channels))
+        lower = np.broadcast_to(np.asarray(lower, dtype=float), shape)
+        upper = np.broadcast_to(np.asarray(upper, dtype=float), shape)
+
+        if channel_budgets is not None:
+            budgets = np.array([channel_budgets[c] for c in self.channels], dtype=float)
+        else:
+            if total_budget is None:
+                total_budget = self.weekly_spend.sum() * horizon
+            budgets = np.array([float(total_budget)])
+
+        def project(x):
+            return self._project(x, lower, upper, budgets)
+
+        # Start from a flat schedule in historical channel proportions
+        shares = self.weekly_spend / self.weekly_spend.sum()
+        if channel_budgets is not None:
+            flat = np.broadcast_to(budgets / horizon, shape)
+        else:
+            flat = np.broadcast_to(budgets[0] * shares / horizon, shape)
+
+        x = project(np.array(flat))
+        value, grad = self.media_sales(x)
+        self.flat_sales_ = value
+
+        step = x.mean() / max(np.abs(grad).max(), 1e-12)
+
+        for n_iter in range(1, max_iter + 1):
+            # Backtracking keeps the ascent monotone
+            for _ in range(50):
+                x_new = project(x + step * grad)
+                value_new, grad_new = self.media_sales(x_new)
+                if value_new >= value:
+                    break
+                step *= 0.5
+            else:
+                break
+
+            s = x_new - x
+            y = grad_new - grad
+            improvement = value_new - value
+            x, value, grad = x_new, value_new, grad_new
+
+            if improvement <= tol * max(abs(value), 1.0):
+                break
+
+            # Barzilai-Borwein step (y·s < 0 for a concave objective)
+            sy = (s * y).sum()
+            step = (s * s).sum() / -sy if sy < 0 else step * 2
+
+        self.expected_sales_ = value
+        self.n_iter_ = n_iter
+
+        return pd.DataFrame(x, columns=self.channels)
+
+    @staticmethod
+    def _project(x, lower, upper, budgets, max_iter: int = 100):
+        """
+        Euclidean projection onto {lower <= x <= upper, sum = budget}.
+
+        With a single budget the sum runs over the whole schedule; with one
+        budget per channel it runs over each column. The shift ``tau`` in
+        ``clip(x - tau, lower, upper)`` is found by Newton steps on the
+        piecewise-linear budget residual, safeguarded by bisection.
+        """
+        if len(budgets) == 1:
+            v, lo, hi = x.reshape(1, -1), lower.reshape(1, -1), upper.reshape(1, -1)
+        else:
+            v, lo, hi = x.T, lower.T, upper.T
+
+        if (lo.sum(axis=1) > budgets).any() or (hi.sum(axis=1) < budgets).any():
+            raise ValueError("Spend bounds are infeasible for the budget")
+
+        finite_hi = np.where(np.isfinite(hi), hi, budgets[:, None] + np.abs(lo))
+        tau_lo = (v - finite_hi).min(axis=1)
+        tau_hi = (v - lo).max(axis=1)
+        tau = 0.5 * (tau_lo + tau_hi)
+        atol = 1e-12 * np.maximum(budgets, 1.0)
+
+        for _ in range(max_iter):
+            shifted = v - tau[:, None]
+            residual = np.clip(shifted, lo, hi).sum(axis=1) - budgets
+            if (np.abs(residual) <= atol).all():
+                break
+
+            tau_lo = np.where(residual > 0, tau, tau_lo)
+            tau_hi = np.where(residual > 0, tau_hi, tau)
+
+            free = ((shifted > lo) & (shifted < hi)).sum(axis=1)
+            newton = tau + residual / np.maximum(free, 1)
+            inside = (free > 0) & (newton > tau_lo) & (newton < tau_hi)
+            tau = np.where(inside, newton, 0.5 * (tau_lo + tau_hi))
+
+        projected = np.clip(v - tau[:, None], lo, hi)
+        return projected.reshape(x.shape) if len(budgets) == 1 else projected.T
@@ -1,10 +1,14 @@
+import numpy as np
 import pandas as pd
+from scipy.optimize import minimize
+
 from src.simulation.scenarios import ScenarioSimulator
 
 
 class BudgetOptimizer:
     """
-    Automatically evaluates which channel gives highest lift for a fixed % increase
+    Automatically evaluates which channel gives highest lift for a fixed % increase,
+    and allocates a total budget across channels to maximize predicted sales
     """
 
     def __init__(self, simulator: ScenarioSimulator, channels: list, increase_pct: float = 0.2):
@@ -31,4 +35,106 @@ class BudgetOptimizer:
             lift = self.simulator.scenario_lift({channel: self.increase_pct})
             results.append({"channel": channel, "sales_lift": lift})
 
-        return pd.DataFrame(results).sort_values(by="sales_lift", ascending=False)
\ No newline at end of file
+        return pd.DataFrame(results).sort_values(by="sales_lift", ascending=False)
+
+    def allocate(
+        self,
+        total_budget: float = None,
+        bounds: dict = None,
+        tol: float = 1e-9,
+        max_iter: int = 200
+    ) -> pd.DataFrame:
+        """
+        Allocate a total budget across channels to maximize predicted sales.
+
+        Each channel keeps its historical weekly spend pattern, scaled so
+        that its total matches the allocated budget. The Hill-of-adstock
+        response and its analytic gradient come from the simulator (linear
+        MMM), and the problem is solved with SLSQP under the budget equality
+        and per-channel bounds.
+
+        Parameters
+        ----------
+        total_budget : float, optional
+            Total spend to allocate over the channels (defaults to current total)
+        bounds : dict, optional
+            Keys = channel names
+            Values = (min_spend, max_spend); None means unbounded on that side
+        tol : float
+            Solver tolerance
+        max_iter : int
+            Maximum solver iterations
+
+        Returns
+        -------
+        pd.DataFrame
+            Current and optimal spend, change and expected lift per channel
+        """
+        sim_channels = self.simulator.channels
+        idx = np.array([sim_channels.index(c) for c in self.channels])
+
+        current = self.simulator.df[self.channels].sum().to_numpy(dtype=float)
+        if (current <= 0).any():
+            # The response is scaled from the historical spend pattern,
+            # which does not exist for channels without spend
+            zero = [c for c, spend in zip(self.channels, current) if spend <= 0]
+            raise ValueError(f"Channels without historical spend cannot be allocated: {zero}")
+        if total_budget is None:
+            total_budget = current.sum()
+
+        bounds = bounds or {}
+        lower = np.zeros(len(self.channels))
+        upper = np.full(len(self.channels), float(total_budget))
+        for i, channel in enumerate(self.channels):
+            lo, hi = bounds.get(channel, (None, None))
+            if lo is not None:
+                lower[i] = lo
+            if hi is not None:
+                upper[i] = hi
+
+        if lower.sum() > total_budget or upper.sum() < total_budget:
+            raise ValueError("Channel bounds are infeasible for the total budget")
+
+        # Work with budget shares so the problem is well scaled
+        lower_share = np.maximum(lower / total_budget, 1e-9)
+        upper_share = upper / total_budget
+        multipliers = np.ones(len(sim_channels))
+        base_lifts, base_grads = self.simulator.channel_response(multipliers)
+        scale = max(np.abs(base_grads[idx]).max(), 1e-12)
+
+        def objective(shares):
+            multipliers[idx] = shares * total_budget / current
+            lifts, grads = self.simulator.channel_response(multipliers)
+            value = -lifts[idx].sum() / scale
+            grad = -grads[idx] * total_budget / current / scale
+            return value, grad
+
+        start = np.clip(current / current.sum(), lower_share, upper_share)
+
+        result = minimize(
+            objective,
+            start,
+            jac=True,
+            method="SLSQP",
+            bounds=list(zip(lower_share, upper_share)),
+            constraints=[{
+                "type": "eq",
+                "fun": lambda shares: shares.sum() - 1.0,
+                "jac": lambda shares: np.ones_like(shares)
+            }],
+            options={"ftol": tol, "maxiter": max_iter}
+        )
+        if not result.success:
+            raise ValueError(f"Budget allocation did not converge: {result.message}")
+
+        optimal = result.x * total_budget
+        multipliers[idx] = optimal / current
+        lifts, _ = self.simulator.channel_response(multipliers)
+
+        return pd.DataFrame({
+            "channel": self.channels,
+            "current_spend": current,
+            "optimal_spend": optimal,
+            "change_pct": optimal / current - 1,
+            "sales_lift": lifts[idx]
+        }).sort_values(by="sales_lift", ascending=False)
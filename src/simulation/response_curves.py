@@ -0,0 +1,202 @@
+import numpy as np
+
+from src.simulation.scenarios import ScenarioSimulator
+
+
+# Interior points of each grid interval where interpolation error is
+# measured, and the margin applied to the largest measured error
+_CHECK_FRACTIONS = np.array([0.125, 0.25, 0.5, 0.75, 0.875])
+_ERROR_MARGIN = 1.25
+
+# (grid x time x channel) arrays alive at once in a gradient-free
+# channel_response: the scaled adstock (saturated in place) and the
+# denominator of the Hill curve
+_RESPONSE_TEMPORARIES = 2
+
+
+class ResponseCurveIndex:
+    """
+    Precomputed incremental-sales curves per channel for fast what-if queries.
+
+    For a linear MMM the lift of a scenario is the sum of independent
+    per-channel curves lift_c(multiplier), so tabulating each curve on a
+    dense grid of spend multipliers answers any spend-change query by
+    interpolation without touching the history.
+    """
+
+    def __init__(
+        self,
+        channels: list,
+        multipliers: np.ndarray,
+        curves: np.ndarray,
+        interval_errors: np.ndarray
+    ):
+        """
+        Parameters
+        ----------
+        channels : list
+            Channel names (row order of ``curves``)
+        multipliers : np.ndarray
+            Increasing grid of spend multipliers (1 = current spend)
+        curves : np.ndarray
+            (channels x grid) incremental sales at each multiplier
+        interval_errors : np.ndarray
+            (channels x grid intervals) interpolation error bound, measured
+            at interior points of each interval
+        """
+        self.channels = list(channels)
+        self.multipliers = np.asarray(multipliers, dtype=float)
+        self.curves = np.asarray(curves, dtype=float)
+        self.interval_errors = np.asarray(interval_errors, dtype=float)
+
+    @classmethod
+    def from_simulator(
+        cls,
+        simulator: ScenarioSimulator,
+        multipliers: np.ndarray = None,
+        max_buffer_mb: float = 4
+    ):
+        """
+        Tabulate response curves from a simulator built on a linear MMM
+
+        Parameters
+        ----------
+        simulator : ScenarioSimulator
+            Simulator holding the training history and model
+        multipliers : np.ndarray, optional
+            Spend multiplier grid (default 0 to 3, geometrically refined
+            near 0 where the Hill curve is steepest)
+        max_buffer_mb : float
+            Upper bound on the (grid x time x channel) temporaries, all
+            counted; a few MB keeps them cache-friendly
+
+        Returns
+        -------
+        ResponseCurveIndex
+        """
+        if not simulator.is_linear:
+            raise ValueError("Response curves require a linear MMM")
+
+        if multipliers is None:
+            multipliers = np.unique(np.concatenate([
+                [0.0], np.geomspace(1e-4, 0.1, 40), np.linspace(0.1, 3.0, 291)
+            ]))
+        multipliers = np.asarray(multipliers, dtype=float)
+
+        # Curve values at the knots and at interior check points of every
+        # interval, where the linear interpolation error is measured
+        width = np.diff(multipliers)
+        checks = multipliers[:-1, None] + width[:, None] * _CHECK_FRACTIONS
+        points = np.concatenate([multipliers, checks.ravel()])
+
+        n_time, n_channels = len(simulator.df), len(simulator.channels)
+        row_bytes = _RESPONSE_TEMPORARIES * n_time * n_channels * 8
+        chunk = max(1, int(max_buffer_mb * 2 ** 20 // row_bytes))
+
+        values = np.empty((len(points), n_channels))
+        for start in range(0, len(points), chunk):
+            grid = np.repeat(points[start:start + chunk, None], n_channels, axis=1)
+            values[start:start + chunk], _ = simulator.channel_response(grid, gradient=False)
+
+        curves = values[:len(multipliers)].T
+
+        exact = values[len(multipliers):].T.reshape(n_channels, len(width), -1)
+        interpolated = (
+            curves[:, :-1, None] * (1 - _CHECK_FRACTIONS)
+            + curves[:, 1:, None] * _CHECK_FRACTIONS
+        )
+        interval_errors = _ERROR_MARGIN * np.abs(exact - interpolated).max(axis=2)
+
+        return cls(simulator.channels, multipliers, curves, interval_errors)
+
+    def query_batch(self, changes: np.ndarray, channels: list = None) -> np.ndarray:
+        """
+        Interpolated sales lift for many scenarios
+
+        Parameters
+        ----------
+        changes : np.ndarray
+            (n_scenarios x n_channels) pct changes
+        channels : list, optional
+            Channel of each column (defaults to index order)
+
+        Returns
+        -------
+        np.ndarray
+            Lift per scenario
+        """
+        channels = self.channels if channels is None else list(channels)
+        scale = 1 + np.atleast_2d(np.asarray(changes, dtype=float))
+
+        if (scale < self.multipliers[0]).any() or (scale > self.multipliers[-1]).any():
+            raise ValueError(
+                f"Spend multipliers must lie in [{self.multipliers[0]}, {self.multipliers[-1]}]"
+            )
+
+        lifts = np.zeros(len(scale))
+        for j, channel in enumerate(channels):
+            curve = self.curves[self.channels.index(channel)]
+            lifts += np.interp(scale[:, j], self.multipliers, curve)
+        return lifts
+
+    def query(self, channel_changes: dict) -> float:
+        """
+        Interpolated sales lift of one scenario {channel: pct change}
+        """
+        channels = list(channel_changes)
+        return float(self.query_batch([list(channel_changes.values())], channels)[0])
+
+    def error_bound(self, channel_changes: dict = None) -> float:
+        """
+        Declared absolute error of a query {channel: pct change}: the sum of
+        the interval errors the query's multipliers fall in. Without a query,
+        the worst case over the grid for changes within [-50%, +100%].
+        """
+        if channel_changes is None:
+            inside = (self.multipliers[:-1] >= 0.5) & (self.multipliers[1:] <= 2.0)
+            return float(self.interval_errors[:, inside].max(axis=1).sum())
+
+        channels = list(channel_changes)
+        return float(self.error_bound_batch([list(channel_changes.values())], channels)[0])
+
+    def error_bound_batch(self, changes: np.ndarray, channels: list = None) -> np.ndarray:
+        """
+        Declared absolute error of each scenario of ``query_batch``
+        (unchanged channels add no error)
+        """
+        channels = self.channels if channels is None else list(channels)
+        scale = 1 + np.atleast_2d(np.asarray(changes, dtype=float))
+
+        bounds = np.zeros(len(scale))
+        for j, channel in enumerate(channels):
+            interval = np.searchsorted(self.multipliers, scale[:, j], side="right") - 1
+            interval = np.clip(interval, 0, len(self.multipliers) - 2)
+            errors = self.interval_errors[self.channels.index(channel), interval]
+            bounds += np.where(scale[:, j] != 1, errors, 0.0)
+        return bounds
+
+    def save(self, path: str):
+        """
+        Persist the index (numpy .npz)
+        """
+        with open(path, "wb") as f:
+            np.savez(
+                f,
+                channels=np.array(self.channels),
+                multipliers=self.multipliers,
+                curves=self.curves,
+                interval_errors=self.interval_errors
+            )
+
+    @classmethod
+    def load(cls, path: str):
+        """
+        Load an index saved with ``save``
+        """
+        with np.load(path) as data:
+            return cls(
+                data["channels"].tolist(),
+                data["multipliers"],
+                data["curves"],
+                data["interval_errors"]
+            )
@@ -1,15 +1,84 @@
+import numpy as np
 import pandas as pd
-from src.features.adstock import adstock_geometric
-from src.features.saturation import hill_saturation
+from src.features.adstock import adstock_geometric, adstock_geometric_matrix
+from src.features.feature_store import FeatureStore
+from src.features.saturation import hill_saturation, hill_saturation_derivative
+from src.models.linear import linear_coefficients
+from src.utils.instrumentation import instrumented
 from src.utils.logger import logger
 
 
+def scenario_matrix(scenarios: dict, channels: list) -> np.ndarray:
+    """
+    Convert {scenario name: {channel: pct change}} to an
+    (n_scenarios x n_channels) change matrix
+    """
+    position = {channel: i for i, channel in enumerate(channels)}
+
+    changes = np.zeros((len(scenarios), len(channels)))
+    for row, scenario_changes in enumerate(scenarios.values()):
+        for channel, pct_change in scenario_changes.items():
+            changes[row, position[channel]] = pct_change
+    return changes
+
+
+def scenario_lifts(
+    adstock: np.ndarray,
+    gammas: np.ndarray,
+    coef: np.ndarray,
+    base_sums: np.ndarray,
+    changes: np.ndarray,
+    max_buffer_mb: float = 256
+) -> np.ndarray:
+    """
+    Sales lift of many scenarios for a linear MMM
+
+    Parameters
+    ----------
+    adstock : np.ndarray
+        (time x channels) raw adstock of current spend
+    gammas, coef, base_sums : np.ndarray
+        Per-channel saturation, model coefficient and baseline column sum
+    changes : np.ndarray
+        (n_scenarios x channels) pct changes
+    max_buffer_mb : float
+        Upper bound on the (scenario x time x channel) working buffer
+
+    Returns
+    -------
+    np.ndarray
+        Lift per scenario
+    """
+    n_time, n_channels = adstock.shape
+    chunk = max(1, int(max_buffer_mb * 2 ** 20 // (n_time * n_channels * 8)))
+    buffer = np.empty((min(chunk, len(changes)), n_time, n_channels))
+    lifts = np.empty(len(changes))
+
+    for start in range(0, len(changes), chunk):
+        scale = 1 + changes[start:start + chunk]
+        buf = buffer[:len(scale)]
+
+        np.multiply(scale[:, None, :], adstock[None, :, :], out=buf)
+        hill_saturation(buf, gamma=gammas, out=buf)
+
+        lifts[start:start + len(scale)] = (buf.sum(axis=1) - base_sums) @ coef
+
+    return lifts
+
+
 class ScenarioSimulator:
     """
     Simulates different marketing spend scenarios and computes sales lift
     """
 
-    def __init__(self, model, df: pd.DataFrame, channel_params: dict, features: list):
+    def __init__(
+        self,
+        model,
+        df: pd.DataFrame,
+        channel_params: dict,
+        features: list,
+        feature_store: FeatureStore = None
+    ):
         """
         Parameters
         ----------
@@ -20,13 +89,132 @@ class ScenarioSimulator:
             Channel adstock & saturation parameters
         features : list
             Model features (including adstocked channels)
+        feature_store : FeatureStore, optional
+            Reuses the raw adstock of columns already transformed
         """
         self.model = model
         self.df = df.copy()
         self.channel_params = channel_params
         self.features = features
+        self.feature_store = feature_store
         self.baseline_sales = self.model.predict(self.df[self.features]).sum()
 
+        self._prepare_linear()
+
+    def _prepare_linear(self):
+        """
+        Precompute state for the linear fast path.
+
+        For a linear model, changing a channel only moves its own
+        transformed column, so the lift is coef * (new column sum - old
+        column sum). Adstock is linear in spend, so scaling spend by
+        (1 + pct) scales the raw adstock by the same factor and only the
+        saturation has to be recomputed. If the raw spend column is itself
+        a feature (e.g. a no-adstock baseline model), it adds
+        raw coef * pct * total spend.
+        """
+        linear = linear_coefficients(self.model, self.features)
+        self.channels = list(self.channel_params)
+
+        if linear is None:
+            self._channel_coef = None
+            return
+
+        coef, _ = linear
+        self._decays = self.decays
+        self._gammas = self.gammas
+
+        # Raw (unsaturated) adstock per channel, (time x channels)
+        spend = self.df[self.channels].to_numpy(dtype=float)
+        if self.feature_store is not None:
+            self._adstock, _ = self.feature_store.transform(spend, self.channels, self._decays)
+        else:
+            self._adstock = adstock_geometric_matrix(spend, self._decays)
+
+        self._channel_coef = np.zeros(len(self.channels))
+        self._column_sums = np.zeros(len(self.channels))
+        # Sales per unit multiplier from raw spend columns used as features
+        self._raw_slope = np.zeros(len(self.channels))
+        for i, channel in enumerate(self.channels):
+            column = f"{channel}_adstock"
+            if column in self.features:
+                self._channel_coef[i] = coef[self.features.index(column)]
+                self._column_sums[i] = self.df[column].sum()
+            if channel in self.features:
+                self._raw_slope[i] = coef[self.features.index(channel)] * spend[:, i].sum()
+
+    @property
+    def decays(self) -> np.ndarray:
+        """
+        Adstock decay per channel (channel_params order)
+        """
+        return np.array([p.get("decay", 0.5) for p in self.channel_params.values()])
+
+    @property
+    def gammas(self) -> np.ndarray:
+        """
+        Hill saturation gamma per channel (channel_params order)
+        """
+        return np.array([p.get("gamma", 0.5) for p in self.channel_params.values()])
+
+    @property
+    def is_linear(self) -> bool:
+        """
+        Whether the model is linear in its features (closed-form fast paths)
+        """
+        return self._channel_coef is not None
+
+    def _linear_lift(self, channel_changes: dict) -> float:
+        """
+        Sales lift of a scenario from per-channel column sums (linear models)
+        """
+        lift = 0.0
+        for channel, pct_change in channel_changes.items():
+            i = self.channels.index(channel)
+            lift += self._raw_slope[i] * pct_change
+            if self._channel_coef[i] == 0:
+                continue
+            new_sum = hill_saturation(
+                (1 + pct_change) * self._adstock[:, i], gamma=self._gammas[i]
+            ).sum()
+            lift += self._channel_coef[i] * (new_sum - self._column_sums[i])
+        return lift
+
+    def channel_response(self, multipliers: np.ndarray, gradient: bool = True):
+        """
+        Per-channel sales lift and its gradient for spend multipliers
+
+        Parameters
+        ----------
+        multipliers : np.ndarray
+            Spend multiplier per channel (channel_params order), 1 = current,
+            or an (n x channels) stack of such vectors
+        gradient : bool
+            Also compute the gradient (otherwise returned as None)
+        Returns
+        -------
+        tuple : (lift per channel, d lift / d multiplier per channel),
+            each shaped like ``multipliers``
+        """
+        if self._channel_coef is None:
+            raise ValueError("channel_response requires a linear MMM")
+
+        multipliers = np.asarray(multipliers, dtype=float)
+        scaled = multipliers[..., None, :] * self._adstock
+        saturated = hill_saturation(
+            scaled, gamma=self._gammas, out=None if gradient else scaled
+        )
+        lifts = self._channel_coef * (
+            saturated.sum(axis=-2) - self._column_sums
+        ) + self._raw_slope * (multipliers - 1)
+        if not gradient:
+            return lifts, None
+
+        grads = self._channel_coef * (
+            self._adstock * hill_saturation_derivative(scaled, gamma=self._gammas)
+        ).sum(axis=-2) + self._raw_slope
+        return lifts, grads
+
     def simulate_budget_change(self, channel_changes: dict) -> float:
         """
         Simulate sales after applying budget changes
@@ -39,6 +227,9 @@ class ScenarioSimulator:
         -------
         float : simulated total sales
         """
+        if self._channel_coef is not None:
+            return self.baseline_sales + self._linear_lift(channel_changes)
+
         df_sim = self.df.copy()
 
         for channel, pct_change in channel_changes.items():
@@ -61,6 +252,67 @@ class ScenarioSimulator:
         simulated_sales = self.simulate_budget_change(channel_changes)
         return simulated_sales - self.baseline_sales
 
+    @instrumented("simulation.simulate_batch", rows="changes")
+    def simulate_batch(
+        self,
+        changes: np.ndarray,
+        channels: list = None,
+        max_buffer_mb: float = 256
+    ):
+        """
+        Simulate many scenarios in one call
+        Parameters
+        ----------
+        changes : np.ndarray
+            (n_scenarios x n_channels) pct changes, e.g. 0.2 for +20%
+        channels : list, optional
+            Channel of each column (defaults to channel_params order)
+        max_buffer_mb : float
+            Upper bound on the (scenario x time x channel) working buffer;
+            scenarios are processed in chunks that fit in it
+        Returns
+        -------
+        tuple : (total sales, sales lift), each of shape (n_scenarios,)
+        """
+        channels = self.channels if channels is None else list(channels)
+        changes = np.atleast_2d(np.asarray(changes, dtype=float))
+        if changes.shape[1] != len(channels):
+            raise ValueError(
+                f"changes has {changes.shape[1]} columns, expected {len(channels)}"
+            )
+        for channel in channels:
+            if channel not in self.channel_params:
+                raise KeyError(channel)
+
+        if self._channel_coef is None:
+            lifts = np.array([
+                self.scenario_lift(dict(zip(channels, row))) for row in changes
+            ])
+            return self.baseline_sales + lifts, lifts
+
+        # Raw spend features are linear in the change
+        idx = np.array([self.channels.index(c) for c in channels], dtype=int)
+        lifts = changes @ self._raw_slope[idx]
+
+        # Only channels that move in some scenario and affect the model
+        active = np.flatnonzero(
+            (changes != 0).any(axis=0) & (self._channel_coef[idx] != 0)
+        )
+        if len(active) == 0:
+            return self.baseline_sales + lifts, lifts
+
+        cols = idx[active]
+        lifts += scenario_lifts(
+            self._adstock[:, cols],
+            self._gammas[cols],
+            self._channel_coef[cols],
+            self._column_sums[cols],
+            changes[:, active],
+            max_buffer_mb=max_buffer_mb
+        )
+
+        return self.baseline_sales + lifts, lifts
+
     def compare_scenarios(self, scenarios: dict) -> pd.DataFrame:
         """
         Compare multiple scenarios
@@ -73,12 +325,13 @@ class ScenarioSimulator:
         -------
         pd.DataFrame
         """
-        data = []
-        for name, changes in scenarios.items():
-            simulated_sales = self.simulate_budget_change(changes)
-            lift = simulated_sales - self.baseline_sales
+        channels = list(self.channel_params)
+        changes = scenario_matrix(scenarios, channels)
 
-            print('simulated: ', simulated_sales)
-            data.append({"Scenario": name, "Total Sales": simulated_sales, "Sales Lift": lift})
+        total_sales, lifts = self.simulate_batch(changes, channels)
 
-        return pd.DataFrame(data).sort_values(by="Sales Lift", ascending=False)
\ No newline at end of file
+        return pd.DataFrame({
+            "Scenario": list(scenarios),
+            "Total Sales": total_sales,
+            "Sales Lift": lifts
+        }).sort_values(by="Sales Lift", ascending=False)
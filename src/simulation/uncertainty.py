@@ -0,0 +1,327 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from src.features.adstock import adstock_geometric_matrix
+from src.features.saturation import hill_saturation
+from src.models.linear import linear_coefficients
+from src.models.ridge_solver import ridge_solve
+from src.simulation.scenarios import ScenarioSimulator, scenario_lifts, scenario_matrix
+from src.utils.logger import logger
+
+
+# Arrays shared with pool workers, attached once per process
+_SHARED = {}
+
+
+def _attach_shared(specs: dict):
+    """
+    Pool initializer: map shared-memory blocks to numpy arrays
+    """
+    for name, (shm_name, shape) in specs.items():
+        shm = shared_memory.SharedMemory(name=shm_name)
+        _SHARED[name] = (shm, np.ndarray(shape, dtype=float, buffer=shm.buf))
+
+
+def _evaluate_draws(coef, decays, gammas, spend=None, changes=None, max_buffer_mb=64):
+    """
+    Lift of every scenario under every draw
+
+    Parameters
+    ----------
+    coef, decays, gammas : np.ndarray
+        (n_draws x channels) sampled channel coefficients and parameters
+    spend, changes : np.ndarray, optional
+        (time x channels) spend and (n_scenarios x channels) changes;
+        taken from shared memory when omitted
+
+    Returns
+    -------
+    np.ndarray
+        (n_scenarios x n_draws) lifts
+    """
+    if spend is None:
+        spend = _SHARED["spend"][1]
+        changes = _SHARED["changes"][1]
+
+    lifts = np.empty((len(changes), len(coef)))
+    for b in range(len(coef)):
+        adstock = adstock_geometric_matrix(spend, decays[b])
+        base_sums = hill_saturation(adstock, gamma=gammas[b]).sum(axis=0)
+        lifts[:, b] = scenario_lifts(
+            adstock, gammas[b], coef[b], base_sums, changes, max_buffer_mb=max_buffer_mb
+        )
+    return lifts
+
+
+class _QuantileSketch:
+    """
+    Fixed-size per-row summary of a stream of values.
+
+    Each row keeps at most ``size`` equally weighted points. New batches
+    are merged with the current points and re-summarized at evenly spaced
+    quantile levels, so memory does not grow with the number of draws.
+    """
+
+    def __init__(self, n_rows: int, size: int = 512):
+        self.size = size
+        self.points = np.empty((n_rows, 0))
+        self.weight = 1.0
+        self.count = 0
+        self.total = np.zeros(n_rows)
+
+    def update(self, values: np.ndarray):
+        self.count += values.shape[1]
+        self.total += values.sum(axis=1)
+
+        if self.weight == 1.0 and self.points.shape[1] + values.shape[1] <= self.size:
+            self.points = np.concatenate([self.points, values], axis=1)
+            return
+
+        points = np.concatenate([self.points, values], axis=1)
+        weights = np.concatenate([
+            np.full(self.points.shape[1], self.weight),
+            np.ones(values.shape[1])
+        ])
+
+        order = np.argsort(points, axis=1)
+        points = np.take_along_axis(points, order, axis=1)
+        cumulative = np.cumsum(weights[order], axis=1) / self.count
+
+        levels = (np.arange(self.size) + 0.5) / self.size
+        self.points = self._lookup(points, cumulative, levels)
+        self.weight = self.count / self.size
+
+    def quantiles(self, levels) -> np.ndarray:
+        # All points carry equal weight at this stage
+        return np.quantile(self.points, levels, axis=1).T
+
+    def mean(self) -> np.ndarray:
+        return self.total / self.count
+
+    @staticmethod
+    def _lookup(points, cumulative, levels):
+        """
+        Row-wise weighted quantile lookup with one flat searchsorted
+        """
+        n_rows, n_points = points.shape
+        offsets = np.arange(n_rows)[:, None] * 2.0
+        flat = (cumulative + offsets).ravel()
+        targets = (levels[None, :] + offsets).ravel()
+
+        idx = np.searchsorted(flat, targets, side="left")
+        idx = np.minimum(idx - np.repeat(np.arange(n_rows) * n_points, len(levels)), n_points - 1)
+        return points[np.repeat(np.arange(n_rows), len(levels)), idx].reshape(n_rows, len(levels))
+
+
+class MonteCarloSimulator:
+    """
+    Uncertainty ranges for scenario lifts by Monte Carlo over model and
+    channel-parameter draws
+    """
+
+    def __init__(
+        self,
+        simulator: ScenarioSimulator,
+        target: str = "sales",
+        method: str = "posterior",
+        param_spread: float = 0.1,
+        n_jobs: int = 1,
+        batch_size: int = 64,
+        random_state=None
+    ):
+        """
+        Parameters
+        ----------
+        simulator : ScenarioSimulator
+            Simulator built on a linear MMM
+        target : str
+            Target column in the simulator's data (for residuals)
+        method : str
+            Coefficient draws: "posterior" (Gaussian Ridge posterior)
+            or "bootstrap" (residual bootstrap with closed-form refits)
+        param_spread : float
+            Relative (log-scale) spread of decay / gamma draws; 0 keeps them fixed
+        n_jobs : int
+            Worker processes; 1 evaluates in-process
+        batch_size : int
+            Draws evaluated per task
+        random_state : int, optional
+            Seed for reproducible draws
+        """
+        if method not in ("posterior", "bootstrap"):
+            raise ValueError(f"Unsupported method: {method}")
+
+        self.simulator = simulator
+        self.target = target
+        self.method = method
+        self.param_spread = param_spread
+        self.n_jobs = n_jobs
+        self.batch_size = batch_size
+        self.rng = np.random.default_rng(random_state)
+
+        self.logger = logger(self.__class__.__name__)
+
+        linear = linear_coefficients(simulator.model, simulator.features)
+        if linear is None:
+            raise ValueError("MonteCarloSimulator requires a linear MMM")
+        self.coef, self.intercept = linear
+
+        # Lifts are drawn for the {channel}_adstock columns only
+        raw = [c for c in simulator.channels if c in simulator.features]
+        if raw:
+            raise ValueError(
+                f"MonteCarloSimulator does not support raw spend features: {raw}"
+            )
+
+        estimator = getattr(simulator.model, "model", simulator.model)
+        self.alpha = float(getattr(estimator, "alpha", 0.0))
+
+        # Position of each channel's feature in the coefficient vector (-1 = unused)
+        self.columns = np.array([
+            simulator.features.index(f"{c}_adstock") if f"{c}_adstock" in simulator.features else -1
+            for c in simulator.channels
+        ])
+
+        X = simulator.df[simulator.features].to_numpy(dtype=float)
+        y = simulator.df[self.target].to_numpy(dtype=float)
+        self.X_c = X - X.mean(axis=0)
+        self.gram = self.X_c.T @ self.X_c
+        self.fitted = X @ self.coef + self.intercept
+        self.residuals = y - self.fitted
+
+    def draw(self, n_draws: int):
+        """
+        Sample channel coefficients, decays and gammas
+
+        Returns
+        -------
+        tuple : three (n_draws x channels) arrays
+        """
+        n, p = self.X_c.shape
+
+        if self.method == "posterior":
+            precision = self.gram + self.alpha * np.eye(p)
+            sigma2 = (self.residuals ** 2).sum() / max(n - p - 1, 1)
+            cov = sigma2 * np.linalg.inv(precision)
+            coef = self.rng.multivariate_normal(self.coef, cov, size=n_draws, method="cholesky")
+        else:
+            coef = np.empty((n_draws, p))
+            for start in range(0, n_draws, self.batch_size):
+                k = min(self.batch_size, n_draws - start)
+                resampled = self.rng.choice(self.residuals, size=(n, k), replace=True)
+                # Refit on fitted + resampled residuals, centered on the
+                # fitted coefficients to avoid shrinking twice
+                xty = self.X_c.T @ (resampled - resampled.mean(axis=0))
+                coef[start:start + k] = self.coef + ridge_solve(self.gram, xty.T, self.alpha)
+
+        channel_coef = np.where(self.columns >= 0, coef[:, self.columns], 0.0)
+
+        def jitter(values, upper):
+            noise = np.exp(self.param_spread * self.rng.standard_normal((n_draws, len(values))))
+            return np.clip(values * noise, 1e-6, upper)
+
+        decays = jitter(self.simulator.decays, 0.999)
+        gammas = jitter(self.simulator.gammas, np.inf)
+
+        return channel_coef, decays, gammas
+
+    def run(
+        self,
+        scenarios,
+        n_draws: int = 1000,
+        quantiles=(0.1, 0.5, 0.9),
+        sketch_size: int = 512
+    ) -> pd.DataFrame:
+        """
+        Lift distribution for each scenario
+
+        Parameters
+        ----------
+        scenarios : dict or np.ndarray
+            {name: channel_changes} or an (n_scenarios x n_channels) change matrix
+        n_draws : int
+            Number of Monte Carlo draws
+        quantiles : tuple
+            Quantile levels to report
+        sketch_size : int
+            Points kept per scenario by the streaming quantile summary
+
+        Returns
+        -------
+        pd.DataFrame
+            Point lift, mean lift and requested quantiles per scenario
+        """
+        if isinstance(scenarios, dict):
+            names = list(scenarios)
+            changes = scenario_matrix(scenarios, self.simulator.channels)
+        else:
+            changes = np.atleast_2d(np.asarray(scenarios, dtype=float))
+            names = list(range(len(changes)))
+
+        spend = self.simulator.df[self.simulator.channels].to_numpy(dtype=float)
+        coef, decays, gammas = self.draw(n_draws)
+        sketch = _QuantileSketch(len(changes), size=sketch_size)
+
+        batches = [
+            slice(start, start + self.batch_size)
+            for start in range(0, n_draws, self.batch_size)
+        ]
+
+        self.logger.info(
+            f"Monte Carlo started | {len(changes)} scenarios x {n_draws} draws"
+        )
+
+        if self.n_jobs == 1:
+            for batch in batches:
+                sketch.update(_evaluate_draws(
+                    coef[batch], decays[batch], gammas[batch], spend, changes
+                ))
+        else:
+            self._run_pool(spend, changes, coef, decays, gammas, batches, sketch)
+
+        _, point = self.simulator.simulate_batch(changes)
+
+        result = pd.DataFrame({
+            "Scenario": names,
+            "Sales Lift": point,
+            "Mean Lift": sketch.mean()
+        })
+        for level, values in zip(quantiles, sketch.quantiles(quantiles).T):
+            result[f"P{round(level * 100):g}"] = values
+
+        self.logger.info("Monte Carlo completed")
+
+        return result
+
+    def _run_pool(self, spend, changes, coef, decays, gammas, batches, sketch):
+        """
+        Evaluate draw batches in worker processes. Spend and scenario arrays
+        are placed in shared memory once; results are folded into the
+        sketch as they complete.
+        """
+        blocks, specs = [], {}
+        try:
+            for name, array in (("spend", spend), ("changes", changes)):
+                shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+                np.ndarray(array.shape, dtype=float, buffer=shm.buf)[...] = array
+                blocks.append(shm)
+                specs[name] = (shm.name, array.shape)
+
+            with ProcessPoolExecutor(
+                max_workers=None if self.n_jobs == -1 else self.n_jobs,
+                initializer=_attach_shared,
+                initargs=(specs,)
+            ) as pool:
+                futures = [
+                    pool.submit(_evaluate_draws, coef[b], decays[b], gammas[b])
+                    for b in batches
+                ]
+                for future in as_completed(futures):
+                    sketch.update(future.result())
+        finally:
+            for shm in blocks:
+                shm.close()
+                shm.unlink()
@@ -0,0 +1,31 @@
+# src/utils/config_loader.py
+from pathlib import Path
+
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+DATA_PATH = BASE_DIR / "data" / "raw" / "synthetic_mmm_data.csv"
+CACHE_DIR = BASE_DIR / "data" / "cache"
+
+CHANNEL_PARAMS = {
+    "tv_spend": {"decay": 0.6, "gamma": 0.5},
+    "digital_spend": {"decay": 0.4, "gamma": 0.6},
+    "search_spend": {"decay": 0.3, "gamma": 0.5},
+    "social_spend": {"decay": 0.5, "gamma": 0.4},
+}
+
+FEATURES_MMM = [
+    "tv_spend_adstock",
+    "digital_spend_adstock",
+    "search_spend_adstock",
+    "social_spend_adstock",
+    "promo_flag",
+    "holiday_flag",
+    "price_index",
+]
+
+BASELINE_FEATURES = [
+    "price_index",
+    "promo_flag",
+    "holiday_flag",
+    "weekofyear",
+]
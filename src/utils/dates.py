@@ -0,0 +1,13 @@
+# src/utils/dates.py
+import pandas as pd
+
+
+def parse_dates(values: pd.Series) -> pd.Series:
+    """
+    Parse ISO dates (as written by ``generator.save_data``), falling back
+    to the day-first format of the raw extracts
+    """
+    try:
+        return pd.to_datetime(values, format="ISO8601")
+    except (ValueError, TypeError):
+        return pd.to_datetime(values, dayfirst=True)
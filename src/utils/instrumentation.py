@@ -0,0 +1,270 @@
+# src/utils/instrumentation.py
+import functools
+import inspect
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+# Aggregates per stage name
+_STATS = {}
+_LOCK = threading.Lock()
+_LOCAL = threading.local()
+
+_ENABLED = os.environ.get("MMM_INSTRUMENTATION", "0") == "1"
+_TRACE_MEMORY = False
+
+# ru_maxrss is in KiB on Linux and bytes on macOS
+_RSS_UNIT = 1 if sys.platform == "darwin" else 1024
+
+
+def enable(trace_memory: bool = False):
+    """
+    Turn instrumentation on
+
+    Parameters
+    ----------
+    trace_memory : bool
+        Measure per-span peak allocations with tracemalloc (slows
+        allocation-heavy code). Otherwise memory is the growth of the
+        process peak RSS during the span.
+    """
+    global _ENABLED, _TRACE_MEMORY
+    _ENABLED = True
+    _TRACE_MEMORY = trace_memory
+    if trace_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+def disable():
+    global _ENABLED, _TRACE_MEMORY
+    _ENABLED = False
+    if _TRACE_MEMORY and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    _TRACE_MEMORY = False
+
+
+def is_enabled() -> bool:
+    return _ENABLED
+
+
+def reset():
+    """
+    Drop all recorded aggregates
+    """
+    with _LOCK:
+        _STATS.clear()
+
+
+def _peak_rss() -> int:
+    if resource is None:
+        return 0
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * _RSS_UNIT
+
+
+class _NoopSpan:
+    """
+    Shared span returned while instrumentation is disabled
+    """
+
+    rows = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __setattr__(self, name, value):
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+class Span:
+    """
+    One timed execution of a stage. Set ``rows`` inside the block to
+    record throughput.
+    """
+
+    def __init__(self, name: str, rows: int = None):
+        self.name = name
+        self.rows = rows
+        self.child_peak = 0
+
+    def __enter__(self):
+        stack = getattr(_LOCAL, "stack", None)
+        if stack is None:
+            stack = _LOCAL.stack = []
+        stack.append(self)
+
+        if _TRACE_MEMORY:
+            self.start_memory = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        else:
+            self.start_memory = _peak_rss()
+
+        self.start_cpu = time.process_time()
+        self.start_wall = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        wall = time.perf_counter() - self.start_wall
+        cpu = time.process_time() - self.start_cpu
+
+        stack = _LOCAL.stack
+        stack.pop()
+
+        if _TRACE_MEMORY and tracemalloc.is_tracing():
+            # Peaks of nested spans are folded into their parent, since
+            # each span resets the tracemalloc peak on entry
+            peak = max(tracemalloc.get_traced_memory()[1], self.child_peak)
+            memory = max(peak - self.start_memory, 0)
+            if stack:
+                stack[-1].child_peak = max(stack[-1].child_peak, peak)
+            tracemalloc.reset_peak()
+        else:
+            memory = max(_peak_rss() - self.start_memory, 0)
+
+        _record(self.name, wall, cpu, self.rows, memory)
+        return False
+
+
+def _record(name, wall, cpu, rows, memory):
+    with _LOCK:
+        stats = _STATS.get(name)
+        if stats is None:
+            stats = _STATS[name] = {
+                "count": 0,
+                "wall_seconds": 0.0,
+                "wall_seconds_max": 0.0,
+                "cpu_seconds": 0.0,
+                "rows": 0,
+                "memory_bytes_max": 0,
+            }
+        stats["count"] += 1
+        stats["wall_seconds"] += wall
+        stats["wall_seconds_max"] = max(stats["wall_seconds_max"], wall)
+        stats["cpu_seconds"] += cpu
+        stats["rows"] += int(rows or 0)
+        stats["memory_bytes_max"] = max(stats["memory_bytes_max"], int(memory))
+
+
+def span(name: str, rows: int = None):
+    """
+    Context manager timing a stage
+
+    Example
+    -------
+    >>> with span("train.ingest") as s:
+    ...     df = DataIngestion(path).load()
+    ...     s.rows = len(df)
+    """
+    if not _ENABLED:
+        return _NOOP
+    return Span(name, rows)
+
+
+def instrumented(name: str = None, rows: str = None):
+    """
+    Decorator timing every call of a function as a span
+
+    Parameters
+    ----------
+    name : str, optional
+        Span name (default: the function's qualified name)
+    rows : str, optional
+        Name of the argument whose length is the row count, or
+        "result" to use the length of the return value
+    """
+    def decorator(fn):
+        span_name = name or fn.__qualname__
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _ENABLED:
+                return fn(*args, **kwargs)
+
+            with Span(span_name) as s:
+                result = fn(*args, **kwargs)
+                if rows == "result":
+                    s.rows = _length(result)
+                elif rows is not None:
+                    bound = signature.bind_partial(*args, **kwargs)
+                    s.rows = _length(bound.arguments.get(rows))
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def _length(value):
+    try:
+        return len(value)
+    except TypeError:
+        return None
+
+
+# -------------------------
+# Export
+# -------------------------
+def snapshot() -> dict:
+    """
+    Aggregates per stage, with mean wall time and throughput
+    """
+    with _LOCK:
+        stats = {name: dict(values) for name, values in _STATS.items()}
+
+    for values in stats.values():
+        values["wall_seconds_mean"] = values["wall_seconds"] / values["count"]
+        values["rows_per_second"] = (
+            values["rows"] / values["wall_seconds"] if values["wall_seconds"] > 0 else 0.0
+        )
+    return stats
+
+
+def to_json(path: str = None) -> str:
+    """
+    Aggregates as JSON, optionally written to ``path``
+    """
+    text = json.dumps(snapshot(), indent=2)
+    if path is not None:
+        with open(path, "w") as f:
+            f.write(text)
+    return text
+
+
+_PROMETHEUS_METRICS = [
+    ("count", "mmm_stage_calls_total", "counter", "Completed spans"),
+    ("wall_seconds", "mmm_stage_wall_seconds_total", "counter", "Wall time spent in the stage"),
+    ("wall_seconds_max", "mmm_stage_wall_seconds_max", "gauge", "Slowest single span"),
+    ("cpu_seconds", "mmm_stage_cpu_seconds_total", "counter", "Process CPU time spent in the stage"),
+    ("rows", "mmm_stage_rows_total", "counter", "Rows processed by the stage"),
+    ("memory_bytes_max", "mmm_stage_memory_bytes_max", "gauge", "Largest memory growth of a span"),
+]
+
+
+def to_prometheus() -> str:
+    """
+    Aggregates in the Prometheus text exposition format
+    """
+    stats = snapshot()
+    lines = []
+    for key, metric, kind, description in _PROMETHEUS_METRICS:
+        lines.append(f"# HELP {metric} {description}")
+        lines.append(f"# TYPE {metric} {kind}")
+        for name, values in sorted(stats.items()):
+            label = name.replace("\\", "\\\\").replace('"', '\\"')
+            lines.append(f'{metric}{{stage="{label}"}} {values[key]}')
+    return "\n".join(lines) + "\n"